@@ -1,11 +1,19 @@
 import pygame
 import random
-import cv2
 import json
+import sys
 import math
-from src.MediPipeHandsModule.HandTrackingModule import hand_detector
-from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
-import collections
+import time
+from src.MediPipeHandsModule.InferenceScheduler import InferenceScheduler
+from src.MediPipeHandsModule.TemporalFilter import OneEuroFilter, GestureHysteresis
+from src.MediPipeHandsModule.Startup import StartupTimer, VisionLoader
+
+def make_preview(detector):
+    if detector is None:
+        return None
+    # Imported on first use: cv2 is loaded by the VisionLoader, not before the menu
+    from src.MediPipeHandsModule.CameraPreview import CameraPreview
+    return CameraPreview(connections=detector.mp_hands.HAND_CONNECTIONS)
 
 # ============================================
 # RETRO DEATH SCREEN
@@ -282,6 +290,10 @@ class Wall(pygame.sprite.Sprite):
         self.rect.y = y
 
 class PacManGame:
+    # Detections per second needed for the game to stay playable.
+    # Turns are queued until the next junction, so a slower rate is fine.
+    MIN_DETECTION_RATE = 10
+
     def __init__(self, screen, cap, detector, gesture_evaluator):
         self.screen = screen
         self.width = screen.get_width()
@@ -289,7 +301,11 @@ class PacManGame:
         self.cap = cap
         self.detector = detector
         self.gesture_evaluator = gesture_evaluator
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.landmark_filter = OneEuroFilter()
+        self.gesture_decision = GestureHysteresis()
+        self.hands = []
+        self.preview = make_preview(self.detector)
+        self.scheduler = InferenceScheduler(target_fps=60, min_rate=self.MIN_DETECTION_RATE)
 
         self.font = pygame.font.SysFont('courier', 36, bold=True)
         self.title_font = pygame.font.SysFont('courier', 72, bold=True)
@@ -372,24 +388,28 @@ class PacManGame:
             self.all_sprites.add(ghost)
     
     def handle_gestures(self):
-        success, img = self.cap.read()
+        success, img, timestamp = self.cap.latest() if self.cap is not None else (False, None, None)
         if success:
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, _ = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list and bbox:
-                gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                self.recent_gestures.append(gesture[0])
-
-            if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                most_common = collections.Counter(self.recent_gestures).most_common(1)[0][0]
+            if self.scheduler.should_detect(self.clock.get_rawtime() / 1000.0):
+                started = time.perf_counter()
+                self.hands = self.detector.find_hands(img, draw=False, timestamp=timestamp, mirror=True)
+
+                if self.hands:
+                    hand = self.hands[0]
+                    hand.smooth(self.landmark_filter)
+                    proba = self.gesture_evaluator.evaluate_proba(hand.landmarks, hand.handedness, hand.bbox)
+                    self.gesture_decision.update_proba(self.gesture_evaluator.classes, proba)
+                else:
+                    self.landmark_filter.reset()
+                    self.gesture_decision.update(None)
+                self.scheduler.record(time.perf_counter() - started)
 
+            current_gesture = self.gesture_decision.current
+            if current_gesture is not None:
                 # 1=up, 2=left, 3=down, 4=right
                 # Queue the direction change instead of changing immediately
-                if most_common in [1, 2, 3, 4]:
-                    self.player.next_direction = most_common
+                if current_gesture in [1, 2, 3, 4]:
+                    self.player.next_direction = current_gesture
 
         return success, img if success else None
     
@@ -398,11 +418,11 @@ class PacManGame:
             pygame.draw.line(self.screen, (10, 10, 10), (0, i), (self.width, i), 1)
     
     def run(self):
-        clock = pygame.time.Clock()
+        self.clock = pygame.time.Clock()
         running = True
 
         while running:
-            dt = clock.tick(60) / 1000.0  # Delta time in seconds
+            dt = self.clock.tick(60) / 1000.0  # Delta time in seconds
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -462,11 +482,8 @@ class PacManGame:
 
             # Webcam - bigger and centered on right side
             if success and img is not None:
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                img_rgb = img_rgb.swapaxes(0, 1)
-                frame = pygame.surfarray.make_surface(img_rgb)
-                cam_width, cam_height = 400, 300
-                frame = pygame.transform.scale(frame, (cam_width, cam_height))
+                frame = self.preview.render(img, self.hands, text=f"DET {self.scheduler.detection_rate:.0f}/s")
+                cam_width, cam_height = self.preview.size
                 cam_x = self.width - cam_width - 20
                 cam_y = (self.height - cam_height) // 2
                 pygame.draw.rect(self.screen, (0, 255, 0), (cam_x - 2, cam_y - 2, cam_width + 4, cam_height + 4), 2)
@@ -603,6 +620,10 @@ class PowerUp(pygame.sprite.Sprite):
             self.kill()
 
 class BreakoutGame:
+    # Detections per second needed for the game to stay playable.
+    # The paddle moves while the gesture is held.
+    MIN_DETECTION_RATE = 20
+
     def __init__(self, screen, cap, detector, gesture_evaluator):
         self.screen = screen
         self.width = screen.get_width()
@@ -610,7 +631,11 @@ class BreakoutGame:
         self.cap = cap
         self.detector = detector
         self.gesture_evaluator = gesture_evaluator
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.landmark_filter = OneEuroFilter()
+        self.gesture_decision = GestureHysteresis()
+        self.hands = []
+        self.preview = make_preview(self.detector)
+        self.scheduler = InferenceScheduler(target_fps=60, min_rate=self.MIN_DETECTION_RATE)
 
         self.font = pygame.font.SysFont('courier', 36, bold=True)
 
@@ -655,23 +680,27 @@ class BreakoutGame:
                 self.all_sprites.add(brick)
     
     def handle_gestures(self, dt):
-        success, img = self.cap.read()
+        success, img, timestamp = self.cap.latest() if self.cap is not None else (False, None, None)
         if success:
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, _ = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list and bbox:
-                gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                self.recent_gestures.append(gesture[0])
-
-            if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                most_common = collections.Counter(self.recent_gestures).most_common(1)[0][0]
+            if self.scheduler.should_detect(self.clock.get_rawtime() / 1000.0):
+                started = time.perf_counter()
+                self.hands = self.detector.find_hands(img, draw=False, timestamp=timestamp, mirror=True)
+
+                if self.hands:
+                    hand = self.hands[0]
+                    hand.smooth(self.landmark_filter)
+                    proba = self.gesture_evaluator.evaluate_proba(hand.landmarks, hand.handedness, hand.bbox)
+                    self.gesture_decision.update_proba(self.gesture_evaluator.classes, proba)
+                else:
+                    self.landmark_filter.reset()
+                    self.gesture_decision.update(None)
+                self.scheduler.record(time.perf_counter() - started)
 
-                if most_common == 2:  # Left
+            current_gesture = self.gesture_decision.current
+            if current_gesture is not None:
+                if current_gesture == 2:  # Left
                     self.paddle.move_left(dt)
-                elif most_common == 4:  # Right
+                elif current_gesture == 4:  # Right
                     self.paddle.move_right(dt)
 
         return success, img if success else None
@@ -681,11 +710,11 @@ class BreakoutGame:
             pygame.draw.line(self.screen, (10, 10, 10), (0, i), (self.width, i), 1)
     
     def run(self):
-        clock = pygame.time.Clock()
+        self.clock = pygame.time.Clock()
         running = True
 
         while running:
-            dt = clock.tick(60) / 1000.0  # Delta time in seconds
+            dt = self.clock.tick(60) / 1000.0  # Delta time in seconds
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -792,11 +821,8 @@ class BreakoutGame:
 
             # Webcam - bigger and centered on right side
             if success and img is not None:
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                img_rgb = img_rgb.swapaxes(0, 1)
-                frame = pygame.surfarray.make_surface(img_rgb)
-                cam_width, cam_height = 400, 300
-                frame = pygame.transform.scale(frame, (cam_width, cam_height))
+                frame = self.preview.render(img, self.hands, text=f"DET {self.scheduler.detection_rate:.0f}/s")
+                cam_width, cam_height = self.preview.size
                 cam_x = self.width - cam_width - 20
                 cam_y = (self.height - cam_height) // 2
                 pygame.draw.rect(self.screen, (0, 255, 0), (cam_x - 2, cam_y - 2, cam_width + 4, cam_height + 4), 2)
@@ -966,6 +992,10 @@ class Platform(pygame.sprite.Group):
                     self.add(block)
 
 class SpaceInvadersGame:
+    # Detections per second needed for the game to stay playable.
+    # The ship moves while the gesture is held.
+    MIN_DETECTION_RATE = 20
+
     def __init__(self, screen, cap, detector, gesture_evaluator):
         self.screen = screen
         self.width = screen.get_width()
@@ -973,7 +1003,11 @@ class SpaceInvadersGame:
         self.cap = cap
         self.detector = detector
         self.gesture_evaluator = gesture_evaluator
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.landmark_filter = OneEuroFilter()
+        self.gesture_decision = GestureHysteresis()
+        self.hands = []
+        self.preview = make_preview(self.detector)
+        self.scheduler = InferenceScheduler(target_fps=60, min_rate=self.MIN_DETECTION_RATE)
         
         self.font = pygame.font.SysFont('courier', 36, bold=True)
         self.title_font = pygame.font.SysFont('courier', 72, bold=True)
@@ -1030,25 +1064,29 @@ class SpaceInvadersGame:
                 self.aliens.add(alien)
     
     def handle_gestures(self, dt, current_time):
-        success, img = self.cap.read()
+        success, img, timestamp = self.cap.latest() if self.cap is not None else (False, None, None)
         if success:
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, _ = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list and bbox:
-                gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                self.recent_gestures.append(gesture[0])
-
-            if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                most_common = collections.Counter(self.recent_gestures).most_common(1)[0][0]
+            if self.scheduler.should_detect(self.clock.get_rawtime() / 1000.0):
+                started = time.perf_counter()
+                self.hands = self.detector.find_hands(img, draw=False, timestamp=timestamp, mirror=True)
+
+                if self.hands:
+                    hand = self.hands[0]
+                    hand.smooth(self.landmark_filter)
+                    proba = self.gesture_evaluator.evaluate_proba(hand.landmarks, hand.handedness, hand.bbox)
+                    self.gesture_decision.update_proba(self.gesture_evaluator.classes, proba)
+                else:
+                    self.landmark_filter.reset()
+                    self.gesture_decision.update(None)
+                self.scheduler.record(time.perf_counter() - started)
 
-                if most_common == 2:  # Left
+            current_gesture = self.gesture_decision.current
+            if current_gesture is not None:
+                if current_gesture == 2:  # Left
                     self.player.move_left(dt)
-                elif most_common == 4:  # Right
+                elif current_gesture == 4:  # Right
                     self.player.move_right(dt)
-                elif most_common == 1:  # Shoot
+                elif current_gesture == 1:  # Shoot
                     self.player.shoot(self.all_sprites, self.bullets, current_time)
 
         return success, img if success else None
@@ -1058,12 +1096,12 @@ class SpaceInvadersGame:
             pygame.draw.line(self.screen, (10, 10, 10), (0, i), (self.width, i), 1)
     
     def run(self):
-        clock = pygame.time.Clock()
+        self.clock = pygame.time.Clock()
         running = True
         current_time = 0
 
         while running:
-            dt = clock.tick(60) / 1000.0  # Delta time in seconds
+            dt = self.clock.tick(60) / 1000.0  # Delta time in seconds
             current_time += dt
 
             for event in pygame.event.get():
@@ -1169,11 +1207,8 @@ class SpaceInvadersGame:
             
             # Webcam - bigger and centered on right side
             if success and img is not None:
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                img_rgb = img_rgb.swapaxes(0, 1)
-                frame = pygame.surfarray.make_surface(img_rgb)
-                cam_width, cam_height = 400, 300
-                frame = pygame.transform.scale(frame, (cam_width, cam_height))
+                frame = self.preview.render(img, self.hands, text=f"DET {self.scheduler.detection_rate:.0f}/s")
+                cam_width, cam_height = self.preview.size
                 cam_x = self.width - cam_width - 20
                 cam_y = (self.height - cam_height) // 2
                 pygame.draw.rect(self.screen, (0, 255, 0), (cam_x - 2, cam_y - 2, cam_width + 4, cam_height + 4), 2)
@@ -1188,22 +1223,29 @@ class SpaceInvadersGame:
 # ============================================
 
 class GameMenu:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, source=0):
+        self.startup = StartupTimer()
+        with self.startup.stage('pygame init + display'):
+            pygame.init()
+
+            self.info = pygame.display.Info()
+            self.width = self.info.current_w
+            self.height = self.info.current_h
+            self.screen = pygame.display.set_mode((self.width, self.height), pygame.FULLSCREEN)
+            pygame.display.set_caption("Retro Gesture Games")
         
-        self.info = pygame.display.Info()
-        self.width = self.info.current_w
-        self.height = self.info.current_h
-        self.screen = pygame.display.set_mode((self.width, self.height), pygame.FULLSCREEN)
-        pygame.display.set_caption("Retro Gesture Games")
+        with self.startup.stage('fonts'):
+            self.title_font = pygame.font.SysFont('courier', 72, bold=True)
+            self.menu_font = pygame.font.SysFont('courier', 48, bold=True)
+            self.font = pygame.font.SysFont('courier', 36, bold=True)
         
-        self.title_font = pygame.font.SysFont('courier', 72, bold=True)
-        self.menu_font = pygame.font.SysFont('courier', 48, bold=True)
-        self.font = pygame.font.SysFont('courier', 36, bold=True)
-        
-        self.cap = cv2.VideoCapture(0)
-        self.detector = hand_detector(max_hands=1, track_con=0.8)
-        self.gesture_evaluator = GestureEvaluator("models/gesture_model.pkl")
+        # Camera, detector and classifier come up in the background while the
+        # menu is already showing
+        self.vision = VisionLoader(source,
+                                   detector_args=dict(max_hands=1, track_con=0.8, roi_tracking=True),
+                                   evaluator_args=dict(cache_step=0.02),
+                                   timer=self.startup)
+        self.reported = False
         
         self.menu_items = [
             "1. PAC-MAN MAZE",
@@ -1265,6 +1307,16 @@ class GameMenu:
             inst_surf = self.font.render(inst, True, color)
             self.screen.blit(inst_surf, (50, y_pos + i * 40))
         
+        # Camera status
+        if not self.vision.ready():
+            status, color = "STARTING CAMERA...", (255, 255, 0)
+        elif self.vision.error is not None:
+            status, color = "NO CAMERA - KEYBOARD ONLY", (255, 0, 0)
+        else:
+            status, color = "CAMERA READY", (0, 255, 0)
+        status_surf = self.font.render(status, True, color)
+        self.screen.blit(status_surf, (self.width - status_surf.get_width() - 50, self.height - 90))
+        
         # Border
         pygame.draw.rect(self.screen, (0, 255, 0), (10, 10, self.width - 20, self.height - 20), 5)
         
@@ -1273,6 +1325,33 @@ class GameMenu:
         
         pygame.display.flip()
     
+    def wait_for_vision(self):
+        """Shows a loading screen until the camera and gesture recognition are up, False if the player quit."""
+        clock = pygame.time.Clock()
+        while not self.vision.ready():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return False
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_q:
+                    return False
+            
+            self.screen.fill((0, 0, 0))
+            text_surf = self.menu_font.render("STARTING CAMERA...", True, (0, 255, 0))
+            self.screen.blit(text_surf, text_surf.get_rect(center=(self.width // 2, self.height // 2)))
+            self.draw_scanline()
+            pygame.display.flip()
+            clock.tick(30)
+        return True
+    
+    def play(self, game_class):
+        if not self.wait_for_vision():
+            return "quit"
+        if self.vision.error is not None:
+            # Playable with the keyboard, the games skip gestures without a camera
+            return game_class(self.screen, None, None, None).run()
+        cap, detector, gesture_evaluator = self.vision.result()
+        return game_class(self.screen, cap, detector, gesture_evaluator).run()
+    
     def run(self):
         clock = pygame.time.Clock()
         running = True
@@ -1285,18 +1364,15 @@ class GameMenu:
                     if event.key == pygame.K_q:
                         running = False
                     elif event.key == pygame.K_1:
-                        result = PacManGame(self.screen, self.cap, self.detector, 
-                                          self.gesture_evaluator).run()
+                        result = self.play(PacManGame)
                         if result == "quit":
                             running = False
                     elif event.key == pygame.K_2:
-                        result = BreakoutGame(self.screen, self.cap, self.detector, 
-                                            self.gesture_evaluator).run()
+                        result = self.play(BreakoutGame)
                         if result == "quit":
                             running = False
                     elif event.key == pygame.K_3:
-                        result = SpaceInvadersGame(self.screen, self.cap, self.detector, 
-                                                  self.gesture_evaluator).run()
+                        result = self.play(SpaceInvadersGame)
                         if result == "quit":
                             running = False
                     elif event.key == pygame.K_UP:
@@ -1305,29 +1381,33 @@ class GameMenu:
                         self.selected = (self.selected + 1) % len(self.menu_items)
                     elif event.key == pygame.K_RETURN:
                         if self.selected == 0:
-                            result = PacManGame(self.screen, self.cap, self.detector, 
-                                              self.gesture_evaluator).run()
+                            result = self.play(PacManGame)
                             if result == "quit":
                                 running = False
                         elif self.selected == 1:
-                            result = BreakoutGame(self.screen, self.cap, self.detector, 
-                                                self.gesture_evaluator).run()
+                            result = self.play(BreakoutGame)
                             if result == "quit":
                                 running = False
                         elif self.selected == 2:
-                            result = SpaceInvadersGame(self.screen, self.cap, self.detector, 
-                                                      self.gesture_evaluator).run()
+                            result = self.play(SpaceInvadersGame)
                             if result == "quit":
                                 running = False
                         elif self.selected == 3:
                             running = False
             
             self.draw_menu()
+            self.startup.mark_once('first menu frame')
+            if self.vision.ready() and not self.reported:
+                print(self.startup.report())
+                if self.vision.error is not None:
+                    print(f'Gesture control unavailable, use the keyboard: {self.vision.error}')
+                self.reported = True
             clock.tick(60)
         
-        self.cap.release()
+        self.vision.close()
         pygame.quit()
 
 if __name__ == "__main__":
-    menu = GameMenu()
+    # Optional argument: camera index or a recorded session directory to replay
+    menu = GameMenu(sys.argv[1] if len(sys.argv) > 1 else 0)
     menu.run()
@@ -0,0 +1,83 @@
+import cv2
+import os
+import sys
+import time
+import numpy as np
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
+from src.MediPipeHandsModule.HandResult import stack_hands
+from src.MediPipeHandsModule.SessionRecorder import ReplaySource
+
+# Replays a recorded session (see record_session.py) through detection and
+# classification as fast as possible and reports per-stage timings, plus how
+# far the landmarks drifted from the ones recorded with the session.
+# usage: python benchmark.py <session dir> [model path] [cache step]
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return f'mean {ms.mean():6.2f} ms  p50 {np.percentile(ms, 50):6.2f} ms  p95 {np.percentile(ms, 95):6.2f} ms'
+
+def main():
+    if len(sys.argv) < 2:
+        print('usage: python benchmark.py <session dir> [model path] [cache step]')
+        return
+    session_path = sys.argv[1]
+    model_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(project_root, 'models', 'gesture_model.pkl')
+    cache_step = float(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    cap = ReplaySource(session_path, realtime=False)
+    detector = hand_detector(max_hands=cap.meta['max_hands'])
+    evaluator = GestureEvaluator(model_path, cache_step=cache_step)
+
+    detect_times = []
+    classify_times = []
+    drift = []
+    frames_with_hands = 0
+
+    started = time.perf_counter()
+    while True:
+        success, img = cap.read()
+        if not success:
+            break
+        img = cv2.flip(img, 1)
+
+        t0 = time.perf_counter()
+        hands = detector.find_hands(img, draw=False)
+        detect_times.append(time.perf_counter() - t0)
+
+        recorded, _ = cap.recorded_hands()
+        if hands:
+            frames_with_hands += 1
+            # All hands of the frame in one model call
+            t0 = time.perf_counter()
+            evaluator.evaluate_batch(*stack_hands(hands))
+            classify_times.append(time.perf_counter() - t0)
+        for i, hand in enumerate(hands):
+            if i < len(recorded) and not np.isnan(recorded[i]).any():
+                drift.append(np.abs(hand.landmarks - recorded[i]).mean())
+    total = time.perf_counter() - started
+
+    print(f'{cap.count} frames in {total:.2f} s ({cap.count / max(total, 1e-9):.1f} fps), hands in {frames_with_hands}')
+    if detect_times:
+        print(f'detection:      {percentiles(detect_times)}')
+    if classify_times:
+        print(f'classification: {percentiles(classify_times)}')
+    if evaluator.cache is not None:
+        print(evaluator.cache.report())
+    if drift:
+        print(f'landmark drift vs recording: {np.mean(drift):.2f} px')
+
+    cap.release()
+    detector.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,91 +1,202 @@
+import bisect
+import collections
 import cv2
+import numpy as np
 import time 
 import os
 import sys
-import csv
 
 #get path to src
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.join(current_dir, '..')
-src_path = os.path.join(project_root, 'src')
 data_path = os.path.join(project_root, 'data')
 
 
-if src_path not in sys.path:
-    sys.path.append(src_path)
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 try:
-    from MediPipeHandsModule.HandTrackingModule import hand_detector
+    from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+    from src.MediPipeHandsModule.Features import normalize_landmarks
+    from src.MediPipeHandsModule.GestureDataset import DatasetWriter, open_dataset
 except ImportError as e:
     print(f'error importing HandTrackingModule: {e}')
 
-def normalize_landmarks(lm_list, bbox, handedness):
-    normalized_landmarks = []
-    if len(lm_list) != 0 and bbox:
-        wrist = lm_list[0]  # Wrist is the first landmark
-        bbox_width = bbox[2]
-        bbox_height = bbox[3]
-        for joint in lm_list:
-            try:
-                # Get relative position to the wrist and scale by bbox dimensions
-                normalized_x = (joint[1] - wrist[1]) / bbox_width
-                normalized_y = (joint[2] - wrist[2]) / bbox_height
-                normalized_landmarks.append((normalized_x, normalized_y))
-            except (TypeError, IndexError, ZeroDivisionError) as e:
-                print(f"Error processing joint: {joint}, error: {e}")
-    return normalized_landmarks
-    
-def write_data(data, hand, number):
-    with open (data_path+'/retro/gestures.csv', 'a') as f:
-        wr = csv.writer(f)
-        wr.writerow([number, hand.lower()] + [item for sublist in data for item in sublist])
+# usage: python capture.py [--burst]
+# Tap 1-9 (0 = 10) to save the current hand for that number. In burst mode
+# (start with --burst or toggle with b) every frame is saved while the key
+# is held, skipping frames where the hand barely moved.
+
+# A held key repeats, the burst ends once no repeat came for this long
+# (covers the keyboard's initial repeat delay). Frames after the last repeat
+# are only kept if another one follows, the key may already be up.
+HOLD_TIMEOUT = 0.6
+# Mean normalized landmark movement below which a burst frame is a duplicate
+MIN_MOTION = 0.01
+# Rows per batch handed to the writer thread
+BATCH_ROWS = 64
+
+class BurstBuffer:
+    """
+    Collects burst samples and hands them to the writer in batches.
+
+    Only rows captured up to the last key event (confirm) are written. The
+    ones after it wait for the next key repeat, or are dropped by end() when
+    none came, because the key was released and the hand may be on its way
+    to the next pose.
+    """
+
+    def __init__(self, writer, counts):
+        self.writer = writer
+        self.counts = counts
+        self.rows = ([], [], [])
+        self.row_times = []
+        self.confirmed = 0.0
+        self.last = {}
+        self.times = collections.deque()
+
+    def add(self, number, hand, landmarks, min_motion=0.0, captured=None):
+        """
+        Args:
+            captured: When the frame was captured, defaults to now.
+
+        Returns:
+            Whether the sample was kept.
+        """
+        last = self.last.get((number, hand))
+        if last is not None and np.abs(landmarks - last).mean() < min_motion:
+            return False
+        self.last[(number, hand)] = landmarks
+        for column, value in zip(self.rows, (number, hand.lower(), landmarks)):
+            column.append(value)
+        self.row_times.append(time.perf_counter() if captured is None else captured)
+        self.counts[number] = self.counts.get(number, 0) + 1
+        self.times.append(time.perf_counter())
+        if self._ready() >= BATCH_ROWS:
+            self.flush(self._ready())
+        return True
+
+    def _ready(self):
+        return bisect.bisect_right(self.row_times, self.confirmed)
+
+    def confirm(self, timestamp):
+        """A key event at timestamp, the rows captured up to it belong to the key."""
+        self.confirmed = timestamp
+
+    def end(self, last_key):
+        """Ends a burst: drops the rows captured after the last key event, writes the rest."""
+        keep = bisect.bisect_right(self.row_times, last_key)
+        for number in self.rows[0][keep:]:
+            self.counts[number] -= 1
+        if keep < len(self.row_times):
+            # A dropped row may be what the next frames would be compared to
+            self.last.clear()
+        self.rows = tuple(column[:keep] for column in self.rows)
+        self.row_times = self.row_times[:keep]
+        self.flush()
+
+    def rate(self):
+        """Samples kept over the last second."""
+        now = time.perf_counter()
+        while self.times and now - self.times[0] > 1.0:
+            self.times.popleft()
+        return len(self.times)
+
+    def flush(self, rows=None):
+        """Writes the oldest `rows` buffered rows, by default all of them."""
+        if rows is None:
+            rows = len(self.row_times)
+        self.writer.put(*(column[:rows] for column in self.rows))
+        self.rows = tuple(column[rows:] for column in self.rows)
+        self.row_times = self.row_times[rows:]
+
+def draw_status(img, burst, recording, rate, counts):
+    mode = 'burst' if burst else 'single'
+    lines = [f'mode: {mode} (b)', f'recording {recording}: {rate}/s' if recording else '']
+    lines += [f'{number}: {counts[number]}' for number in sorted(counts)]
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (10, 30 + 25 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2, cv2.LINE_AA)
 
 def main():
+    burst = '--burst' in sys.argv[1:]
+    # data/retro/gestures/, imported from gestures.csv on first use
+    dataset = open_dataset(data_path+'/retro/gestures.csv')
+    labels, _, _ = dataset.arrays()
+    numbers, totals = np.unique(labels, return_counts=True)
+    counts = dict(zip(numbers.tolist(), totals.tolist()))
+    writer = DatasetWriter(dataset)
+    buffer = BurstBuffer(writer, counts)
+
     cap = cv2.VideoCapture(0)
     detector = hand_detector()
-    pTime = 0
-    landmarks_to_save = []
+    landmarks_to_save = None
     hand_to_save = None
+    recording = None
+    last_key = 0.0
 
     # main loop
     while True:
         success, img = cap.read()
+        captured = time.perf_counter()
 
         if success:
             img = cv2.flip(img, 1)
-            img = detector.find_hands(img)
-            handedness = detector.get_handedness()
+            hands = detector.find_hands(img)
 
-            landmarks_to_save = []
+            landmarks_to_save = None
             hand_to_save = None
 
-            if handedness:
+            if hands:
                 # Only process the first detected hand
-                hand = handedness[0]
-                lm_list, bbox, mid = detector.get_bbox_location(img, hand_no=0)
-                if len(lm_list) != 0 and bbox:
-                    img = cv2.putText(img, hand, (bbox[0] + bbox[2] + 10, bbox[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-                    normalized_landmarks = normalize_landmarks(lm_list, bbox, hand)
-                    if normalized_landmarks:
-                        landmarks_to_save = normalized_landmarks
-                        hand_to_save = hand
+                hand = hands[0]
+                bbox = hand.bbox
+                img = cv2.putText(img, hand.handedness, (bbox[0] + bbox[2] + 10, bbox[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+                landmarks_to_save = normalize_landmarks(hand.landmarks, bbox).ravel()
+                hand_to_save = hand.handedness
+
+            if recording is not None and time.perf_counter() - last_key > HOLD_TIMEOUT:
+                buffer.end(last_key)
+                print(f'Burst for number {recording} done, {counts.get(recording, 0)} samples')
+                recording = None
+            if recording is not None and hand_to_save:
+                buffer.add(recording, hand_to_save, landmarks_to_save, MIN_MOTION, captured)
 
+            draw_status(img, burst, recording, buffer.rate(), counts)
             cv2.imshow('hand capture', img)
             key = cv2.waitKey(1) & 0xFF
 
             if key == ord('q'):
                 break
-            
+
+            if key == ord('b'):
+                burst = not burst
+                if recording is not None:
+                    buffer.end(last_key)
+                recording = None
+
             if ord('0') <= key <= ord('9'):
                 num = int(chr(key))
                 if num == 0:
                     num = 10
-                if landmarks_to_save and hand_to_save:
-                    write_data(landmarks_to_save, hand_to_save, num)
+                if burst:
+                    if recording is not None and recording != num:
+                        buffer.end(last_key)
+                    recording = num
+                    last_key = time.perf_counter()
+                    buffer.confirm(last_key)
+                elif hand_to_save:
+                    buffer.add(num, hand_to_save, landmarks_to_save)
+                    buffer.flush()
                     print(f"Saved {hand_to_save} hand data for number {num}")
                 else:
                     print('no landmarks to save')
 
+    if recording is not None:
+        buffer.end(last_key)
+    buffer.flush()
+    writer.close()
+    print(f'{len(dataset)} samples in {dataset.path}')
     cap.release()
     cv2.destroyAllWindows()
 
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import joblib
+import numpy as np
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+models_path = os.path.join(project_root, 'models')
+data_path = os.path.join(project_root, 'data')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CompiledForest import CompiledForest, is_forest
+from src.MediPipeHandsModule.GestureDataset import load_table
+
+# Compiles the pickled random forests into CompiledForest .npz files next to
+# them, checks that the compiled predictions are identical to sklearn's and
+# reports the single-sample latency of both.
+# usage: python compile_forest.py [model.pkl ...]
+
+DEFAULT_MODELS = ['gesture_model.pkl', 'random_forest_left.pkl', 'random_forest_right.pkl']
+
+def check_samples(n_features):
+    # Real captured data where it fits the model, random samples on top
+    samples = []
+    if n_features == 43:
+        samples.append(load_table(os.path.join(data_path, 'retro', 'gestures.csv'))[1])
+    elif n_features == 42:
+        # The per-hand models' data (train_hands.py), without the handedness column
+        samples.append(load_table(os.path.join(data_path, 'numbers', 'gestures-backup.csv'))[1][:, 1:])
+    rng = np.random.default_rng(42)
+    samples.append(rng.uniform(-1.5, 1.5, (1000, n_features)).astype(np.float32))
+    return np.concatenate(samples)
+
+def latency(predict, X, repeats=200):
+    times = []
+    for i in range(repeats):
+        row = X[i % len(X)].reshape(1, -1)
+        t0 = time.perf_counter()
+        predict(row)
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+def main():
+    paths = sys.argv[1:] or [os.path.join(models_path, name) for name in DEFAULT_MODELS]
+    for path in paths:
+        forest = joblib.load(path)
+        if not is_forest(forest):
+            print(f'{path}: not a random forest, skipped')
+            continue
+
+        compiled = CompiledForest.from_sklearn(forest)
+        out_path = os.path.splitext(path)[0] + '.npz'
+        compiled.save(out_path)
+        compiled = CompiledForest.load(out_path)
+
+        X = check_samples(forest.n_features_in_)
+        expected = forest.predict(X)
+        got = compiled.predict(X)
+        mismatches = int(np.sum(expected != got))
+        proba_equal = np.array_equal(forest.predict_proba(X), compiled.predict_proba(X))
+
+        print(f'{os.path.basename(path)} -> {os.path.basename(out_path)}: '
+              f'{len(forest.estimators_)} trees, {compiled.feature.size} nodes, depth {compiled.depth}')
+        print(f'  {len(X)} samples: {mismatches} mismatched predictions, probabilities identical: {proba_equal}')
+        print(f'  single sample latency: sklearn {latency(forest.predict, X):.3f} ms, '
+              f'compiled {latency(compiled.predict, X):.3f} ms')
+
+if __name__ == "__main__":
+    main()
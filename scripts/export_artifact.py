@@ -0,0 +1,58 @@
+import os
+import sys
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule import Backends
+from src.MediPipeHandsModule.ModelArtifact import load_artifact, save_artifact
+
+# Exports gesture backends as model artifacts: models/<backend>/ with a JSON
+# header and memory-mappable .npy arrays, which Backends.load_backend then
+# prefers over the pickles. The training CSV is hashed into the header and
+# the backend's accuracy and latency on the bundled samples are recorded.
+# usage: python export_artifact.py [backend ...]
+
+# Data each backend in Backends.CANDIDATES was trained on (see the train scripts)
+TRAINING_DATA = {
+    'forest': os.path.join(project_root, 'data', 'retro', 'gestures.csv'),
+    'knn': os.path.join(project_root, 'data', 'numbers', 'gestures-snake.csv'),
+    'cnn': os.path.join(project_root, 'data', 'numbers', 'gestures-snake.csv'),
+}
+
+def main():
+    names = sys.argv[1:] or list(TRAINING_DATA)
+    # Held out of the forest's training when train.py saved them
+    holdout = os.path.exists(Backends.HOLDOUT_PATH)
+    samples = Backends.load_samples(Backends.HOLDOUT_PATH) if holdout else Backends.load_samples()
+
+    for name in names:
+        out_path = os.path.join(Backends.MODELS_PATH, name)
+        try:
+            # From the pickles/.npz, an existing artifact is about to be overwritten
+            model = Backends.load_backend(name, artifacts=False)
+        except Exception as e:
+            print(f'{name}: could not load ({e}), skipped')
+            continue
+        if not hasattr(model, 'ARTIFACT_KIND'):
+            print(f'{name}: {type(model).__name__} has no artifact format, skipped')
+            continue
+
+        accuracy, latency = Backends.measure(model, *samples)
+        save_artifact(out_path, model,
+                      training_data=TRAINING_DATA.get(name),
+                      benchmark={'accuracy': accuracy, 'latency_ms': latency * 1000})
+
+        # Load it back the way the games will
+        loaded = load_artifact(out_path)
+        same = (loaded.predict(samples[0]) == model.predict(samples[0])).all()
+        print(f'{name} -> {out_path}: {loaded.header["kind"]}, accuracy {accuracy * 100:.1f}%, '
+              f'{latency * 1000:.3f} ms per call, reloaded predictions identical: {same}')
+
+if __name__ == "__main__":
+    main()
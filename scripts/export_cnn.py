@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import joblib
+import numpy as np
+import torch
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CNNModel import CNN
+from src.MediPipeHandsModule.GestureDataset import load_table, read_watermark
+from src.MediPipeHandsModule.NumpyCNN import NumpyCNN
+
+# Exports the torch CNN's weights to an .npz that NumpyCNN runs without
+# torch, checks that both give the same outputs and compares their latency.
+# The training CSV gives the outputs their gesture labels (train_cnn.py's
+# LabelEncoder order).
+# usage: python export_cnn.py [model.pkl] [training csv]
+
+def latency(run, X, repeats=200):
+    times = []
+    for i in range(repeats):
+        row = X[i % len(X)].reshape(1, -1)
+        t0 = time.perf_counter()
+        run(row)
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, 'models', 'gesture_model_cnn.pkl')
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(project_root, 'data', 'numbers', 'gestures-snake.csv')
+
+    model = joblib.load(model_path)
+    model.eval()
+
+    y, X = load_table(csv_path)
+    # The labels train_cnn.py recorded, else the ones its LabelEncoder would give the data
+    watermark = read_watermark(model_path)
+    classes = np.asarray(watermark['labels']) if watermark is not None else np.unique(y)
+    if len(classes) != model.fc2.out_features:
+        raise SystemExit(f'{len(classes)} labels {classes.tolist()} but the model has {model.fc2.out_features} outputs, '
+                         f'pass the CSV it was trained on or train it again with train_cnn.py')
+
+    exported = NumpyCNN.from_torch(model, classes)
+    out_path = os.path.splitext(model_path)[0] + '.npz'
+    exported.save(out_path)
+    exported = NumpyCNN.load(out_path)
+
+    def run_torch(rows):
+        with torch.no_grad():
+            return model(torch.from_numpy(rows[:, 1:].reshape(-1, 1, 6, 7)), torch.from_numpy(rows[:, :1])).numpy()
+
+    expected = run_torch(X)
+    got = exported.forward(X)
+    print(f'{os.path.basename(model_path)} -> {os.path.basename(out_path)}')
+    print(f'  {len(X)} samples: max logit difference {np.abs(expected - got).max():.2e}, '
+          f'{int(np.sum(expected.argmax(axis=1) != got.argmax(axis=1)))} mismatched predictions')
+    print(f'  single sample latency: torch {latency(run_torch, X):.3f} ms, numpy {latency(exported.forward, X):.3f} ms')
+
+if __name__ == "__main__":
+    main()
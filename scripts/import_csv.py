@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+data_path = os.path.join(project_root, 'data')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.GestureDataset import GestureDataset, dataset_path, import_csv, is_dataset, read_csv_rows
+
+# Imports the capture CSVs into GestureDataset directories next to them
+# (data/retro/gestures.csv -> data/retro/gestures/), which capture.py then
+# appends to and the training scripts load instead of the CSV. Malformed
+# rows are skipped and counted, like clean_csv.py did. Prints how long
+# parsing the CSV took against loading the dataset.
+# usage: python import_csv.py [csv ...]
+
+DEFAULT_DIRS = ['numbers', 'retro']
+
+def main():
+    paths = sys.argv[1:] or sorted(
+        os.path.join(data_path, d, name) for d in DEFAULT_DIRS
+        for name in os.listdir(os.path.join(data_path, d)) if name.endswith('.csv')
+    )
+    for csv_path in paths:
+        out_path = dataset_path(csv_path)
+        if is_dataset(out_path):
+            print(f'{csv_path}: {out_path} exists, delete it to import again')
+            continue
+        # left.csv / right.csv have no handedness column
+        stem = os.path.basename(out_path)
+        handedness = stem if stem in ('left', 'right') else None
+
+        t0 = time.perf_counter()
+        read_csv_rows(csv_path, handedness)
+        parse_ms = (time.perf_counter() - t0) * 1000
+
+        dataset, rows, skipped = import_csv(csv_path, out_path, handedness)
+        if not rows:
+            print(f'{csv_path}: no rows, skipped')
+            continue
+
+        t0 = time.perf_counter()
+        GestureDataset(out_path).features()
+        load_ms = (time.perf_counter() - t0) * 1000
+        print(f'{csv_path} -> {out_path}: {rows} rows, {len(dataset.index["labels"])} labels, '
+              f'{skipped} malformed rows skipped; load {parse_ms:.1f} ms as CSV, {load_ms:.1f} ms as dataset')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import cv2
+import os
+import sys
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+data_path = os.path.join(project_root, 'data')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+from src.MediPipeHandsModule.SessionRecorder import SessionRecorder
+
+# Records a webcam session (raw frames + detected landmarks) for replaying
+# through the games or scripts/benchmark.py without a camera.
+# usage: python record_session.py [output dir] [max hands]
+
+def main():
+    out_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_path, 'sessions', 'session')
+    max_hands = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    cap = cv2.VideoCapture(0)
+    detector = hand_detector(max_hands=max_hands)
+    recorder = SessionRecorder(out_path, max_hands=max_hands)
+
+    # main loop
+    while True:
+        success, img = cap.read()
+        if not success:
+            continue
+
+        # Record the frame as the camera delivered it, the games flip it themselves
+        raw = img.copy()
+        img = cv2.flip(img, 1)
+        hands = detector.find_hands(img)
+        recorder.write(raw, hands=hands)
+
+        cv2.putText(img, f'REC {recorder.count}', (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
+        cv2.imshow('record session', img)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    recorder.close()
+    print(f'Saved {recorder.count} frames to {out_path}')
+    cap.release()
+    detector.close()
+    cv2.destroyAllWindows()
+
+if __name__ == "__main__":
+    main()
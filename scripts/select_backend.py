@@ -0,0 +1,26 @@
+import os
+import sys
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule import Backends
+
+# Benchmarks the gesture backends on this machine and prints which one
+# GESTURE_BACKEND=auto would pick. Set GESTURE_BACKEND to that name to skip
+# the benchmark at game start.
+# usage: python select_backend.py [min accuracy] [backend ...]
+
+def main():
+    min_accuracy = float(sys.argv[1]) if len(sys.argv) > 1 else 0.9
+    names = sys.argv[2:] or None
+    _, _, report = Backends.select_backend(names, min_accuracy=min_accuracy)
+    print('\n'.join(report))
+
+if __name__ == "__main__":
+    main()
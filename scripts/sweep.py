@@ -0,0 +1,285 @@
+import argparse
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+
+#get path to src
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+data_path = os.path.join(project_root, 'data')
+cache_root = os.path.join(project_root, '.cache', 'sweep')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import joblib
+import numpy as np
+
+from src.MediPipeHandsModule import Backends
+from src.MediPipeHandsModule.Augment import LandmarkAugmenter
+from src.MediPipeHandsModule.CompiledForest import CompiledForest
+from src.MediPipeHandsModule.GestureDataset import dataset_path, is_dataset, load_table, write_watermark
+from src.MediPipeHandsModule.IndexedKNN import IndexedKNN
+from src.MediPipeHandsModule.ModelArtifact import file_sha256, is_artifact
+from src.MediPipeHandsModule.NumpyCNN import NumpyCNN
+
+# Cross-validates random forest, KNN and CNN configurations on a process pool
+# and prints a leaderboard of accuracy against single-sample latency, the
+# latter measured on the runtime model the games would load (CompiledForest,
+# IndexedKNN, NumpyCNN). Configurations on the accuracy/latency front (no
+# other one is both more accurate and faster) are marked with *.
+#
+# The feature matrix, the fold split and every finished (configuration,
+# fold) result are cached in .cache/sweep/<data hash>/, so a rerun only
+# trains what is new.
+#
+# With --augment N the training folds get N random variants per row
+# (Augment.LandmarkAugmenter), --mirror 2:4 adds mirrored rows of gesture 2
+# as gesture 4. Test folds are never augmented.
+#
+# --save CONFIG trains a configuration (as printed in the leaderboard, or
+# best for the top one) on all rows and writes it to models/ as the backend
+# the games load: gesture_model.pkl, gesture_model_knn.npz or
+# gesture_model_cnn.npz.
+# usage: python sweep.py [data] [--folds K] [--jobs N] [--random N] [--models rf knn cnn]
+#                        [--augment N] [--mirror LABEL:LABEL ...] [--save CONFIG]
+
+GRID = {
+    'rf': {'n_estimators': [25, 50, 100, 200], 'max_depth': [None, 8, 16]},
+    'knn': {'n_neighbors': [1, 3, 5, 9], 'n_components': [None, 8, 16]},
+    'cnn': {'epochs': [10, 20], 'lr': [0.001, 0.0003]},
+}
+
+def configs(models, sample=None, seed=0):
+    """(model, params) for every grid point, or sample of them at random."""
+    grid = [(model, dict(zip(GRID[model], values)))
+            for model in models for values in itertools.product(*GRID[model].values())]
+    if sample is not None and sample < len(grid):
+        grid = random.Random(seed).sample(grid, sample)
+    return grid
+
+def config_key(model, params):
+    return model + ' ' + ' '.join(f'{k}={v}' for k, v in params.items())
+
+def data_hash(path):
+    # The dataset next to a CSV wins, like load_table
+    if path.endswith('.csv') and is_dataset(dataset_path(path)):
+        path = dataset_path(path)
+    if is_dataset(path):
+        # The index alone misses a segment rewritten under the same name
+        # (compact), so the segment files' sizes and mtimes go in as well
+        digest = hashlib.sha256(file_sha256(os.path.join(path, 'index.json')).encode())
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.npy'):
+                stat = os.stat(os.path.join(path, name))
+                digest.update(f'{name} {stat.st_size} {stat.st_mtime_ns}'.encode())
+        return digest.hexdigest()[:16]
+    return file_sha256(path)[:16]
+
+def prepare(path, folds, seed):
+    """Writes the features, labels and stratified fold numbers to the cache once."""
+    cache = os.path.join(cache_root, data_hash(path))
+    os.makedirs(cache, exist_ok=True)
+    if not os.path.exists(os.path.join(cache, 'y.npy')):
+        y, X = load_table(path)
+        np.save(os.path.join(cache, 'X.npy'), np.ascontiguousarray(X))
+        np.save(os.path.join(cache, 'y.npy'), np.asarray(y))
+    fold_path = os.path.join(cache, f'folds-{folds}-{seed}.npy')
+    if not os.path.exists(fold_path):
+        from sklearn.model_selection import StratifiedKFold
+        y = np.load(os.path.join(cache, 'y.npy'))
+        fold = np.empty(len(y), dtype=np.int8)
+        for i, (_, test) in enumerate(StratifiedKFold(folds, shuffle=True, random_state=seed).split(np.zeros(len(y)), y)):
+            fold[test] = i
+        np.save(fold_path, fold)
+    return cache, fold_path
+
+# Per worker process, loaded once by init_worker
+WORKER = {}
+
+def init_worker(cache, fold_path, copies=0, mirror=None):
+    WORKER['augment'] = (copies, LandmarkAugmenter(mirror=mirror, seed=0)) if copies or mirror else None
+    WORKER['X'] = np.load(os.path.join(cache, 'X.npy'), mmap_mode='r')
+    WORKER['y'] = np.load(os.path.join(cache, 'y.npy'), mmap_mode='r')
+    WORKER['fold'] = np.load(fold_path)
+
+# Sweep model -> the Backends candidate --save writes
+BACKENDS = {'rf': 'forest', 'knn': 'knn', 'cnn': 'cnn'}
+
+def fit_forest(params, X, y):
+    from sklearn.ensemble import RandomForestClassifier
+    forest = RandomForestClassifier(n_estimators=params['n_estimators'], max_depth=params['max_depth'],
+                                    random_state=42, n_jobs=1)
+    return forest.fit(X, y)
+
+def fit_runtime(model, params, X, y):
+    """Trains a configuration and returns it as the runtime model."""
+    if model == 'rf':
+        return CompiledForest.from_sklearn(fit_forest(params, X, y))
+    if model == 'knn':
+        return IndexedKNN.fit(X, y, n_neighbors=params['n_neighbors'], n_components=params['n_components'])
+
+    import torch
+    from torch import nn
+    from torch.utils.data import DataLoader, TensorDataset
+    from src.MediPipeHandsModule.CNNModel import CNN
+    # One core per worker, the pool provides the parallelism
+    torch.set_num_threads(1)
+    torch.manual_seed(42)
+    classes, labels = np.unique(y, return_inverse=True)
+    cnn = CNN(num_classes=len(classes))
+    loader = DataLoader(TensorDataset(torch.tensor(X[:, 1:].reshape(-1, 1, 6, 7)), torch.tensor(X[:, :1]),
+                                      torch.tensor(labels, dtype=torch.long)), batch_size=32, shuffle=True)
+    criterion = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(cnn.parameters(), lr=params['lr'])
+    for _ in range(params['epochs']):
+        for landmarks, handedness, target in loader:
+            optimizer.zero_grad()
+            criterion(cnn(landmarks, handedness), target).backward()
+            optimizer.step()
+    cnn.eval()
+    return NumpyCNN.from_torch(cnn, classes)
+
+def run_fold(model, params, fold, model_path=None):
+    """Worker: accuracy of a configuration on one fold, the fitted model saved to model_path if given."""
+    X, y, folds = WORKER['X'], WORKER['y'], WORKER['fold']
+    train, test = folds != fold, folds == fold
+    X_train, y_train = np.asarray(X[train], dtype=np.float32), np.asarray(y[train])
+    if WORKER['augment'] is not None:
+        copies, augmenter = WORKER['augment']
+        X_train, y_train = augmenter.augment(X_train, y_train, copies)
+    runtime = fit_runtime(model, params, X_train, y_train)
+    if model_path is not None:
+        runtime.save(model_path)
+    return float(np.mean(runtime.predict(X[test]) == y[test]))
+
+def pareto(rows):
+    """Marks the rows no other row beats on both accuracy and latency."""
+    return [not any(o['accuracy'] >= r['accuracy'] and o['latency_ms'] <= r['latency_ms'] and o is not r
+                    and (o['accuracy'] > r['accuracy'] or o['latency_ms'] < r['latency_ms']) for o in rows)
+            for r in rows]
+
+def save_config(key, data, X, y, augment=None):
+    """Trains the configuration printed as key on all rows and writes it to models/."""
+    grid = {config_key(model, params): (model, params) for model, params in configs(list(GRID))}
+    if key not in grid:
+        raise SystemExit(f'Unknown configuration {key!r}, use one from the leaderboard')
+    model, params = grid[key]
+    X = np.asarray(X, dtype=np.float32)
+    # Rows of the data itself, for the watermarks
+    rows, labels = len(y), y
+    if augment is not None:
+        copies, augmenter = augment
+        X, y = augmenter.augment(X, y, copies)
+    backend = BACKENDS[model]
+    path = os.path.join(Backends.MODELS_PATH, Backends.CANDIDATES[backend][1])
+    if model == 'rf':
+        # The sklearn forest, like train.py saves it, the loader compiles it
+        joblib.dump(fit_forest(params, X, y), path)
+        # Rows seen, for train_incremental.py
+        write_watermark(path, data, rows, labels)
+    else:
+        fit_runtime(model, params, X, y).save(path)
+    if model == 'knn':
+        # train_incremental.py updates the sklearn model next to it, keep it on the same rows
+        from sklearn.neighbors import KNeighborsClassifier
+        pkl_path = os.path.splitext(path)[0] + '.pkl'
+        joblib.dump(KNeighborsClassifier(n_neighbors=params['n_neighbors']).fit(X, y), pkl_path)
+        write_watermark(pkl_path, data, rows, labels)
+    print(f'\nSaved {key} trained on {len(y)} rows to {os.path.relpath(path, project_root)} '
+          f'(GESTURE_BACKEND={backend})')
+    if is_artifact(os.path.join(Backends.MODELS_PATH, backend)):
+        print(f'models/{backend}/ still holds the old model, run export_artifact.py {backend}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-validated hyperparameter sweep for the gesture models.')
+    parser.add_argument('data', nargs='?', default=os.path.join(data_path, 'retro', 'gestures.csv'),
+                        help='capture CSV or GestureDataset directory')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--random', type=int, default=None, help='sample this many configurations instead of the full grid')
+    parser.add_argument('--models', nargs='+', default=list(GRID), choices=list(GRID))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--augment', type=int, default=0, help='random variants per training row')
+    parser.add_argument('--mirror', nargs='+', default=[], metavar='LABEL:LABEL',
+                        help='add mirrored rows of the first label as the second')
+    parser.add_argument('--save', metavar='CONFIG',
+                        help="train this configuration on all rows and write it to models/, 'best' for the top one")
+    args = parser.parse_args()
+    mirror = {int(a): int(b) for a, b in (pair.split(':') for pair in args.mirror)}
+
+    cache, fold_path = prepare(args.data, args.folds, args.seed)
+    # Augmented runs are cached apart from plain ones
+    run = f'{args.folds}-{args.seed}' + (f'-aug{args.augment}' if args.augment else '') \
+        + ''.join(f'-m{a}to{b}' for a, b in sorted(mirror.items()))
+    results_path = os.path.join(cache, f'results-{run}.jsonl')
+    done = {}
+    if os.path.exists(results_path):
+        with open(results_path, 'r') as f:
+            for line in f:
+                entry = json.loads(line)
+                done[(entry['config'], entry['fold'])] = entry['accuracy']
+
+    grid = configs(args.models, args.random, args.seed)
+    model_dir = os.path.join(cache, f'models-{run}')
+    os.makedirs(model_dir, exist_ok=True)
+    def model_path(model, params):
+        return os.path.join(model_dir, hashlib.sha1(config_key(model, params).encode()).hexdigest()[:12] + '.npz')
+
+    # Fold 0 also keeps its model, for measuring the latency afterwards
+    tasks = [(model, params, fold) for model, params in grid for fold in range(args.folds)
+             if (config_key(model, params), fold) not in done
+             or (fold == 0 and not os.path.exists(model_path(model, params)))]
+    print(f'{len(grid)} configurations x {args.folds} folds, {len(tasks)} to run on {args.jobs} processes '
+          f'(cache {os.path.relpath(cache, project_root)})')
+
+    failed = {}
+    with concurrent.futures.ProcessPoolExecutor(args.jobs, initializer=init_worker,
+                                                    initargs=(cache, fold_path, args.augment, mirror)) as pool, \
+            open(results_path, 'a') as results:
+        futures = {pool.submit(run_fold, model, params, fold, model_path(model, params) if fold == 0 else None):
+                   (config_key(model, params), fold) for model, params, fold in tasks}
+        for future in concurrent.futures.as_completed(futures):
+            key, fold = futures[future]
+            try:
+                done[(key, fold)] = future.result()
+            except Exception as e:
+                # e.g. torch missing for the CNN configurations
+                failed[key] = e
+                continue
+            results.write(json.dumps({'config': key, 'fold': fold, 'accuracy': done[(key, fold)]}) + '\n')
+            results.flush()
+
+    # Latency one configuration at a time, so they don't compete for cores
+    X = np.load(os.path.join(cache, 'X.npy'))
+    y = np.load(os.path.join(cache, 'y.npy'))
+    loaders = {'rf': CompiledForest.load, 'knn': IndexedKNN.load, 'cnn': NumpyCNN.load}
+    rows = []
+    for model, params in grid:
+        key = config_key(model, params)
+        scores = [done[(key, fold)] for fold in range(args.folds) if (key, fold) in done]
+        if key in failed or len(scores) < args.folds:
+            print(f'{key}: failed ({failed.get(key)})')
+            continue
+        _, latency = Backends.measure(loaders[model](model_path(model, params)), X, y)
+        rows.append({'config': key, 'accuracy': np.mean(scores), 'std': np.std(scores), 'latency_ms': latency * 1000})
+
+    rows.sort(key=lambda r: (-r['accuracy'], r['latency_ms']))
+    print(f'\n{"":2}{"configuration":<40} {"accuracy":>14} {"latency":>11}')
+    for row, front in zip(rows, pareto(rows)):
+        print(f'{"*" if front else " ":2}{row["config"]:<40} {row["accuracy"] * 100:6.1f}% ± {row["std"] * 100:4.1f} '
+              f'{row["latency_ms"]:8.3f} ms')
+
+    if args.save:
+        if args.save == 'best' and not rows:
+            raise SystemExit('No configuration finished, nothing to save')
+        augment = (args.augment, LandmarkAugmenter(mirror=mirror, seed=0)) if args.augment or mirror else None
+        save_config(rows[0]['config'] if args.save == 'best' else args.save, args.data, X, y, augment)
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,31 @@
-import pandas as pd
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+data_path = os.path.join(project_root, 'data', 'retro', 'gestures.csv')
+model_path = os.path.join(project_root, 'models', 'gesture_model.pkl')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
 import numpy as np 
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
 import joblib
 
-df = pd.read_csv('/home/kr3915/Projects/MediaControl/data/retro/gestures.csv', header=None)
+from src.MediPipeHandsModule.Backends import save_holdout
+from src.MediPipeHandsModule.GestureDataset import load_table, write_watermark
+
+# The dataset next to the CSV (scripts/import_csv.py) once there is one.
+# Handedness is encoded the same way as at runtime: left=0, right=1,
+# followed by the landmark data
+y, X = load_table(data_path)
 
-if len(df) < 2:
+if len(y) < 2:
     print("Not enough data to train the model. Please capture more gestures.")
 else:
-    y = df.iloc[:, 0]
-
-    # Encode handedness (column 1)
-    handedness = df.iloc[:, 1].astype('category').cat.codes
-
-    # Landmark data starts from column 2
-    landmarks = df.iloc[:, 2:]
-
-    # Combine handedness and landmarks into features
-    X = pd.concat([handedness, landmarks], axis=1)
-
     X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42
             )
@@ -29,6 +34,10 @@ else:
     model.fit(X_train, y_train)
 
     accuracy = model.score(X_test, y_test)
+    # The test rows, so select_backend scores the backends on rows the forest hasn't seen
+    save_holdout(X_test, y_test)
     print(f'Accuracy for unified model: {accuracy:.2f}')
-    joblib.dump(model, '/home/kr3915/Projects/MediaControl/models/gesture_model.pkl')
+    joblib.dump(model, model_path)
+    # Rows seen, for train_incremental.py
+    write_watermark(model_path, data_path, len(y), y)
     print('Saved unified gesture model.')
@@ -1,5 +1,13 @@
-import pandas as pd
-import numpy as np
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
 import torch
 from torch import nn
 from torch.utils.data import DataLoader, TensorDataset
@@ -7,53 +15,50 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import joblib
 
+from src.MediPipeHandsModule.Augment import LandmarkAugmenter
+from src.MediPipeHandsModule.CNNModel import CNN
+from src.MediPipeHandsModule.GestureDataset import load_table, write_watermark
+from src.MediPipeHandsModule.NumpyCNN import NumpyCNN
+
+# With an argument, every epoch trains on that many fresh random variants
+# (Augment.LandmarkAugmenter) per row on top of the rows themselves
+# usage: python train_cnn.py [augmented copies per row]
+copies = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+
 # Load the dataset
-df = pd.read_csv('../data/numbers/gestures-snake.csv', header=None)
+# Handedness is encoded the same way as at runtime: left=0, right=1
+y, X = load_table('../data/numbers/gestures-snake.csv')
 
-if len(df) < 2:
+if len(y) < 2:
     print("Not enough data to train the model. Please capture more gestures.")
 else:
-    # Separate features and labels
-    y = df.iloc[:, 0].values
-    handedness = df.iloc[:, 1].values
-    landmarks = df.iloc[:, 2:].values
-
-    # Encode labels and handedness
+    # Encode labels
     label_encoder = LabelEncoder()
-    y = label_encoder.fit_transform(y)
-    handedness = label_encoder.fit_transform(handedness)
-
-    # Reshape landmarks to (num_samples, 1, 6, 7)
-    landmarks = landmarks.reshape(-1, 1, 6, 7)
-
-    # Convert to PyTorch tensors
-    X_landmarks = torch.tensor(landmarks, dtype=torch.float32)
-    X_handedness = torch.tensor(handedness, dtype=torch.float32).unsqueeze(1)
-    y = torch.tensor(y, dtype=torch.long)
+    labels = label_encoder.fit_transform(y)
 
     # Split data into training and testing sets
-    X_landmarks_train, X_landmarks_test, X_handedness_train, X_handedness_test, y_train, y_test = train_test_split(
-        X_landmarks, X_handedness, y, test_size=0.2, random_state=42
-    )
+    X_train, X_test, y_train, y_test = train_test_split(X, labels, test_size=0.2, random_state=42)
 
-    # Create TensorDatasets and DataLoaders
-    train_dataset = TensorDataset(X_landmarks_train, X_handedness_train, y_train)
-    test_dataset = TensorDataset(X_landmarks_test, X_handedness_test, y_test)
-    train_loader = DataLoader(train_dataset, batch_size=32, shuffle=True)
-    test_loader = DataLoader(test_dataset, batch_size=32, shuffle=False)
+    def loader(X, y, shuffle):
+        # Landmarks reshaped to (num_samples, 1, 6, 7), handedness to (num_samples, 1)
+        dataset = TensorDataset(torch.tensor(X[:, 1:].reshape(-1, 1, 6, 7), dtype=torch.float32),
+                                torch.tensor(X[:, :1], dtype=torch.float32),
+                                torch.tensor(y, dtype=torch.long))
+        return DataLoader(dataset, batch_size=32, shuffle=shuffle)
 
-from src.MediPipeHandsModule.CNNModel import CNN
+    test_loader = loader(X_test, y_test, shuffle=False)
 
     # Instantiate the model, loss function, and optimizer
-    num_classes = len(np.unique(y))
+    num_classes = len(label_encoder.classes_)
     model = CNN(num_classes=num_classes)
     criterion = nn.CrossEntropyLoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
 
     # Training loop
     num_epochs = 20
-    for epoch in range(num_epochs):
-        for landmarks, handedness, labels in train_loader:
+    augmenter = LandmarkAugmenter(seed=42)
+    for epoch, (X_epoch, y_epoch) in enumerate(augmenter.epochs(X_train, y_train, num_epochs, copies)):
+        for landmarks, handedness, labels in loader(X_epoch, y_epoch, shuffle=True):
             optimizer.zero_grad()
             outputs = model(landmarks, handedness)
             loss = criterion(outputs, labels)
@@ -78,4 +83,10 @@ from src.MediPipeHandsModule.CNNModel import CNN
 
     # Save the model
     joblib.dump(model, '../models/gesture_model_cnn.pkl')
+    # Rows seen, for train_incremental.py
+    write_watermark('../models/gesture_model_cnn.pkl', '../data/numbers/gestures-snake.csv', len(X), label_encoder.classes_)
     print('Saved CNN gesture model.')
+
+    # Weights for the torch-free runtime (Backends 'cnn'), outputs labelled with the gestures
+    NumpyCNN.from_torch(model, label_encoder.classes_).save('../models/gesture_model_cnn.npz')
+    print('Exported CNN weights for NumPy inference.')
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from src.MediPipeHandsModule import Backends
+from src.MediPipeHandsModule.CompiledForest import CompiledForest
+from src.MediPipeHandsModule.Features import HANDEDNESS_CODES
+from src.MediPipeHandsModule.GestureDataset import load_table, write_watermark
+
+# Trains one random forest per hand on a capture with both hands, split by
+# the handedness column, and saves them as the
+# 'left_right' backend (random_forest_left.pkl / random_forest_right.pkl).
+# A unified forest is trained on the same split, and both are compared on
+# the held-out rows: accuracy per hand, model size and latency for one hand
+# and for a two-hand frame, compiled the way the games run them.
+# usage: python train_hands.py [capture csv] [trees]
+
+# data/retro/gestures.csv (train.py's) only has right hands
+DEFAULT_DATA = os.path.join(project_root, 'data', 'numbers', 'gestures-backup.csv')
+
+def batch_latency(model, X, rows, repeats=200):
+    times = []
+    for i in range(repeats):
+        start = (i * rows) % max(len(X) - rows, 1)
+        batch = X[start:start + rows]
+        t0 = time.perf_counter()
+        model.predict_proba(batch)
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA
+    trees = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    y, X = load_table(csv_path)
+
+    # One split for both so they are scored on the same rows
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    unified = RandomForestClassifier(n_estimators=trees, random_state=42)
+    unified.fit(X_train, y_train)
+
+    per_hand = {}
+    for hand, code in HANDEDNESS_CODES.items():
+        rows = X_train[:, 0] == code
+        if not rows.any():
+            print(f'No {hand} hand rows in {csv_path}, capture some before training per-hand models.')
+            return
+        # Handedness is constant within a hand, the per-hand model only sees the landmarks
+        model = RandomForestClassifier(n_estimators=trees, random_state=42)
+        model.fit(X_train[rows, 1:], y_train[rows])
+        per_hand[hand] = model
+
+    for hand, model in per_hand.items():
+        path = os.path.join(Backends.MODELS_PATH, f'random_forest_{hand}.pkl')
+        joblib.dump(model, path)
+        # Rows seen, for train_incremental.py
+        write_watermark(path, csv_path, len(y), y)
+        print(f'Saved {hand} hand model to {path}')
+
+    candidates = {
+        'unified': CompiledForest.from_sklearn(unified),
+        'left_right': Backends.HandRouter(*(CompiledForest.from_sklearn(per_hand[hand]) for hand in HANDEDNESS_CODES)),
+    }
+    sizes = {
+        'unified': sum(t.tree_.node_count for t in unified.estimators_),
+        'left_right': sum(t.tree_.node_count for m in per_hand.values() for t in m.estimators_),
+    }
+
+    print(f'\n{len(X_train)} training / {len(X_test)} test rows, {trees} trees per forest')
+    print(f'{"":>10}  {"accuracy":>8}  {"left":>6}  {"right":>6}  {"nodes":>7}  {"1 hand":>9}  {"2 hands":>9}')
+    results = {}
+    for name, model in candidates.items():
+        accuracy, latency = Backends.measure(model, X_test, y_test)
+        correct = model.predict(X_test) == y_test
+        by_hand = [correct[X_test[:, 0] == code].mean() * 100 for code in HANDEDNESS_CODES.values()]
+        frame = batch_latency(model, X_test, 2)
+        results[name] = (accuracy, latency)
+        print(f'{name:>10}  {accuracy * 100:7.1f}%  {by_hand[0]:5.1f}%  {by_hand[1]:5.1f}%  {sizes[name]:7d}  '
+              f'{latency * 1000:6.3f} ms  {frame:6.3f} ms')
+
+    (u_acc, u_lat), (r_acc, r_lat) = results['unified'], results['left_right']
+    # Only worth switching for a real gain, a tie keeps the simpler unified model
+    if r_acc > u_acc and r_lat <= u_lat:
+        print('\nThe per-hand forests win, run the games with GESTURE_BACKEND=left_right')
+    else:
+        print('\nThe unified forest wins, keep GESTURE_BACKEND=forest')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+models_path = os.path.join(project_root, 'models')
+data_path = os.path.join(project_root, 'data')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+
+from src.MediPipeHandsModule.CompiledForest import is_forest
+from src.MediPipeHandsModule.Features import HANDEDNESS_CODES
+from src.MediPipeHandsModule.GestureDataset import load_table, read_watermark, write_watermark
+from src.MediPipeHandsModule.IndexedKNN import IndexedKNN
+from src.MediPipeHandsModule.ModelArtifact import is_artifact
+
+# Updates the trained models with only the samples captured since they were
+# last trained, instead of retraining from scratch. A watermark file next to
+# each model (<model>.watermark.json) records how many rows of its data it
+# has seen and which labels. New rows are added by:
+#   partial_fit        models that support it
+#   forests            extra trees grown on the new rows plus a replay of old ones
+#   knn                the new rows appended to the samples and the index rebuilt
+#   cnn                a few epochs of fine-tuning on the new rows plus a replay
+# A model without a watermark, or whose data gained a label, is rebuilt from
+# all rows instead.
+# usage: python train_incremental.py [model ...]
+
+# Model -> (model file(s) in models/, capture data it is trained on)
+MODELS = {
+    'forest': ('gesture_model.pkl', os.path.join(data_path, 'retro', 'gestures.csv')),
+    'left_right': (('random_forest_left.pkl', 'random_forest_right.pkl'), os.path.join(data_path, 'numbers', 'gestures-backup.csv')),
+    'knn': ('gesture_model_knn.pkl', os.path.join(data_path, 'numbers', 'gestures-snake.csv')),
+    'cnn': ('gesture_model_cnn.pkl', os.path.join(data_path, 'numbers', 'gestures-snake.csv')),
+}
+
+# Trees added to a forest per update
+EXTRA_TREES = 10
+# Old rows per label mixed into an update, so the update still sees every
+# label and doesn't drift towards the new rows
+REPLAY_PER_LABEL = 20
+FINE_TUNE_EPOCHS = 5
+
+def replay(X, y, per_label=REPLAY_PER_LABEL, seed=0):
+    rng = np.random.default_rng(seed)
+    keep = np.concatenate([rng.permutation(np.flatnonzero(y == label))[:per_label] for label in np.unique(y)])
+    keep.sort()
+    return X[keep], y[keep]
+
+def update_sklearn(model, X_new, y_new, X_old, y_old):
+    if not np.isin(y_new, model.classes_).all():
+        raise ValueError(f'new labels {sorted(set(np.unique(y_new).tolist()) - set(model.classes_.tolist()))}')
+    if hasattr(model, 'partial_fit'):
+        model.partial_fit(X_new, y_new, classes=model.classes_)
+    elif is_forest(model):
+        X_rep, y_rep = replay(X_old, y_old)
+        # warm_start keeps the fitted trees and only grows the extra ones
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + EXTRA_TREES)
+        model.fit(np.concatenate([X_rep, X_new]), np.concatenate([y_rep, y_new]))
+        model.set_params(warm_start=False)
+    elif hasattr(model, '_fit_X'):
+        # Neighbours have nothing to train, the new rows just join the samples
+        model.fit(np.concatenate([model._fit_X, X_new]), np.concatenate([model.classes_[model._y], y_new]))
+    else:
+        raise ValueError(f'{type(model).__name__} cannot be updated incrementally')
+    return model
+
+def fit_cnn(model, X, y, epochs, lr):
+    import torch
+    from torch import nn
+    from torch.utils.data import DataLoader, TensorDataset
+
+    landmarks = torch.tensor(X[:, 1:].reshape(-1, 1, 6, 7), dtype=torch.float32)
+    handedness = torch.tensor(X[:, :1], dtype=torch.float32)
+    loader = DataLoader(TensorDataset(landmarks, handedness, torch.tensor(y, dtype=torch.long)), batch_size=32, shuffle=True)
+    criterion = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    model.train()
+    for _ in range(epochs):
+        for batch_landmarks, batch_handedness, labels in loader:
+            optimizer.zero_grad()
+            loss = criterion(model(batch_landmarks, batch_handedness), labels)
+            loss.backward()
+            optimizer.step()
+    model.eval()
+    return model
+
+def train_cnn(model, X, y, classes, X_old=None, y_old=None):
+    """Fine-tunes model on X, y plus a replay of the old rows, or trains a new CNN if model is None."""
+    from src.MediPipeHandsModule.CNNModel import CNN
+    from src.MediPipeHandsModule.NumpyCNN import NumpyCNN
+
+    if model is None:
+        model = fit_cnn(CNN(num_classes=len(classes)), X, np.searchsorted(classes, y), epochs=20, lr=0.001)
+    else:
+        X_rep, y_rep = replay(X_old, y_old)
+        X, y = np.concatenate([X_rep, X]), np.concatenate([y_rep, y])
+        model = fit_cnn(model, X, np.searchsorted(classes, y), epochs=FINE_TUNE_EPOCHS, lr=0.0001)
+    # Weights for the torch-free runtime as well (Backends 'cnn')
+    NumpyCNN.from_torch(model, classes).save(os.path.join(models_path, 'gesture_model_cnn.npz'))
+    return model
+
+def rebuild(name, X, y):
+    if name == 'forest':
+        return [RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)]
+    if name == 'left_right':
+        models = []
+        for hand, code in HANDEDNESS_CODES.items():
+            rows = X[:, 0] == code
+            if not rows.any():
+                # The hand's model file is left as it is, its watermark still records the rows
+                print(f'{name}: no {hand} hand rows, {hand} hand model not rebuilt')
+                models.append(None)
+                continue
+            models.append(RandomForestClassifier(n_estimators=100, random_state=42).fit(X[rows, 1:], y[rows]))
+        return models
+    if name == 'knn':
+        knn = KNeighborsClassifier(n_neighbors=5).fit(X, y)
+        IndexedKNN.from_sklearn(knn).save(os.path.join(models_path, 'gesture_model_knn.npz'))
+        return [knn]
+    return [train_cnn(None, X, y, np.unique(y))]
+
+def update(name, models, X_new, y_new, X_old, y_old, classes):
+    if name == 'forest':
+        return [update_sklearn(models[0], X_new, y_new, X_old, y_old)]
+    if name == 'left_right':
+        updated = []
+        for model, code in zip(models, HANDEDNESS_CODES.values()):
+            new, old = X_new[:, 0] == code, X_old[:, 0] == code
+            if new.any():
+                model = update_sklearn(model, X_new[new, 1:], y_new[new], X_old[old, 1:], y_old[old])
+            updated.append(model)
+        return updated
+    if name == 'knn':
+        knn = update_sklearn(models[0], X_new, y_new, X_old, y_old)
+        knn_path = os.path.join(models_path, 'gesture_model_knn.npz')
+        if os.path.exists(knn_path):
+            # Keeps the PCA projection the indexed model was trained with
+            IndexedKNN.load(knn_path).extend(X_new, y_new).save(knn_path)
+        return [knn]
+    return [train_cnn(models[0], X_new, y_new, classes, X_old, y_old)]
+
+def accuracy(name, models, X, y, classes):
+    if name == 'left_right':
+        hands = X[:, 0].astype(int)
+        predicted = np.empty(len(y), dtype=object)
+        for model, code in zip(models, HANDEDNESS_CODES.values()):
+            if (hands == code).any():
+                predicted[hands == code] = model.predict(X[hands == code, 1:])
+        return np.mean(predicted == y)
+    if name == 'cnn':
+        from src.MediPipeHandsModule.Backends import CNNBackend
+        return np.mean(CNNBackend(models[0], classes).predict(X) == y)
+    return np.mean(models[0].predict(X) == y)
+
+def main():
+    names = sys.argv[1:] or list(MODELS)
+    for name in names:
+        files, data = MODELS[name]
+        paths = [os.path.join(models_path, f) for f in ((files,) if isinstance(files, str) else files)]
+        y, X = load_table(data)
+        watermark = read_watermark(paths[0])
+        if watermark is not None and (watermark['data'] != os.path.basename(data) or watermark['rows'] > len(y)):
+            watermark = None
+
+        seen = watermark['rows'] if watermark else 0
+        new_labels = set(np.unique(y[seen:]).tolist()) - set(watermark['labels'] if watermark else [])
+        try:
+            if watermark is None or new_labels:
+                reason = 'no watermark' if watermark is None else f'new labels {sorted(new_labels)}'
+                print(f'{name}: {reason}, rebuilding from all {len(y)} rows')
+                models = rebuild(name, X, y)
+            elif seen == len(y):
+                print(f'{name}: up to date ({seen} rows)')
+                continue
+            else:
+                classes = np.asarray(watermark['labels'])
+                models = [joblib.load(path) for path in paths]
+                X_new, y_new = X[seen:], y[seen:]
+                before = accuracy(name, models, X_new, y_new, classes)
+                try:
+                    models = update(name, models, X_new, y_new, X[:seen], y[:seen], classes)
+                except ValueError as e:
+                    # e.g. a label new to one hand's model only
+                    print(f'{name}: {e}, rebuilding from all {len(y)} rows')
+                    models = rebuild(name, X, y)
+                else:
+                    after = accuracy(name, models, X_new, y_new, classes)
+                    print(f'{name}: updated with {len(y_new)} new rows, accuracy on them '
+                          f'{before * 100:.1f}% -> {after * 100:.1f}%')
+        except Exception as e:
+            # torch is optional, and one model failing shouldn't keep the others from updating
+            print(f'{name}: skipped ({type(e).__name__}: {e})')
+            continue
+
+        for model, path in zip(models, paths):
+            if model is not None:
+                joblib.dump(model, path)
+            # Also for a hand with no rows, so it doesn't count as never trained and rebuild every run
+            write_watermark(path, data, len(y), y)
+        if is_artifact(os.path.join(models_path, name)):
+            print(f'{name}: models/{name}/ still holds the old model, run export_artifact.py {name}')
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,40 @@
-import pandas as pd
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
 import numpy as np 
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.preprocessing import LabelEncoder
 import joblib
+import time
 
-df = pd.read_csv('../data/numbers/gestures-snake.csv', header=None)
+from src.MediPipeHandsModule.GestureDataset import load_table, write_watermark
+from src.MediPipeHandsModule.IndexedKNN import IndexedKNN
 
-if len(df) < 2:
-    print("Not enough data to train the model. Please capture more gestures.")
-else:
-    y = df.iloc[:, 0]
+# usage: python train_knn.py [pca components]
+n_components = int(sys.argv[1]) if len(sys.argv) > 1 else None
 
-    # Encode handedness (column 1)
-    handedness = df.iloc[:, 1].astype('category').cat.codes
+def single_query_ms(model, X):
+    times = []
+    for row in X[:200]:
+        t0 = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
 
-    # Landmark data starts from column 2
-    landmarks = df.iloc[:, 2:]
-
-    # Combine handedness and landmarks into features
-    X = pd.concat([handedness, landmarks], axis=1)
+# Handedness encoded the same way as at runtime: left=0, right=1, followed by
+# the landmark data
+y, X = load_table('../data/numbers/gestures-snake.csv')
 
+if len(y) < 2:
+    print("Not enough data to train the model. Please capture more gestures.")
+else:
     X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42
             )
@@ -31,4 +45,14 @@ else:
     accuracy = model.score(X_test, y_test)
     print(f'Accuracy for unified model: {accuracy:.2f}')
     joblib.dump(model, '../models/gesture_model_knn.pkl')
+    # Rows seen, for train_incremental.py
+    write_watermark('../models/gesture_model_knn.pkl', '../data/numbers/gestures-snake.csv', len(y), y)
     print('Saved unified gesture model.')
+
+    # Same neighbours over a float32 matrix, brute force or a tree index by size (Backends 'knn')
+    indexed = IndexedKNN.fit(X_train, y_train, n_neighbors=5, n_components=n_components)
+    indexed_accuracy = np.mean(indexed.predict(X_test) == y_test)
+    print(f'Accuracy for indexed model ({indexed.samples.shape[1]} dims, {indexed.index}): {indexed_accuracy:.2f}')
+    print(f'Single query: sklearn {single_query_ms(model, X_test):.3f} ms, indexed {single_query_ms(indexed, X_test):.3f} ms')
+    indexed.save('../models/gesture_model_knn.npz')
+    print('Saved indexed gesture model.')
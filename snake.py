@@ -1,10 +1,11 @@
-import collections
 import pygame
 import math
 import random
+import time
 import pygame
 
 import json
+import sys
 
 LEADERBOARD_FILE = 'leaderboard.json'
 
@@ -26,10 +27,10 @@ def save_leaderboard(leaderboard):
         json.dump(leaderboard, file, indent=4)
 
 
-import cv2
 import numpy as np
-from src.MediPipeHandsModule.HandTrackingModule import hand_detector
-from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
+from src.MediPipeHandsModule.InferenceScheduler import InferenceScheduler
+from src.MediPipeHandsModule.TemporalFilter import OneEuroFilter, GestureHysteresis
+from src.MediPipeHandsModule.Startup import StartupTimer, VisionLoader
 
 class Snake:
     def __init__(self, screen_width, screen_height, snake_block):
@@ -88,14 +89,19 @@ class Food:
         self.food_y = round(random.randrange(0, self.screen_height - self.snake_block) / 10.0) * 10.0
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    # The snake only moves 15 times a second, so it needs a gesture for every step
+    MIN_DETECTION_RATE = 15
 
-        self.infoObject = pygame.display.Info()
-        self.SCREEN_WIDTH = self.infoObject.current_w
-        self.SCREEN_HEIGHT = self.infoObject.current_h
-        self.SCREEN = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.FULLSCREEN)
-        pygame.display.set_caption("Snake Game")
+    def __init__(self, source=0):
+        self.startup = StartupTimer()
+        with self.startup.stage('pygame init + display'):
+            pygame.init()
+
+            self.infoObject = pygame.display.Info()
+            self.SCREEN_WIDTH = self.infoObject.current_w
+            self.SCREEN_HEIGHT = self.infoObject.current_h
+            self.SCREEN = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.FULLSCREEN)
+            pygame.display.set_caption("Snake Game")
 
         self.WHITE = (255, 255, 255)
         self.GREEN = (0, 255, 0)
@@ -107,14 +113,41 @@ class Game:
 
         self.FONT = pygame.font.SysFont(None, 50)
 
-        self.cap = cv2.VideoCapture(0)
-        self.detector = hand_detector(max_hands=1)
-        self.gesture_evaluator = GestureEvaluator("models/gesture_model.pkl")
+        # Camera, detector and classifier come up in the background, the game
+        # starts with keyboard controls until they are ready
+        self.vision = VisionLoader(source,
+                                   detector_args=dict(max_hands=1, roi_tracking=True),
+                                   evaluator_args=dict(cache_step=0.02),
+                                   timer=self.startup)
+        self.cap = None
+        self.detector = None
+        self.gesture_evaluator = None
+        self.preview = None
+        self.vision_failed = False
 
         self.snake = Snake(self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.SNAKE_BLOCK)
         self.food = Food(self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.SNAKE_BLOCK)
         self.clock = pygame.time.Clock()
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.landmark_filter = OneEuroFilter()
+        self.gesture_decision = GestureHysteresis()
+        self.hands = []
+        self.captions = []
+        self.scheduler = InferenceScheduler(target_fps=self.SNAKE_SPEED, min_rate=self.MIN_DETECTION_RATE)
+
+    def vision_ready(self):
+        """Takes over the camera, detector and classifier once the loader has them."""
+        if self.cap is None and self.vision.ready() and not self.vision_failed:
+            if self.vision.error is not None:
+                # Reported once, the game stays on keyboard control
+                print(f'Gesture control unavailable, use the keyboard: {self.vision.error}')
+                self.vision_failed = True
+                return False
+            self.cap, self.detector, self.gesture_evaluator = self.vision.result()
+            # cv2 is already imported by the loader at this point
+            from src.MediPipeHandsModule.CameraPreview import CameraPreview
+            self.preview = CameraPreview(connections=self.detector.mp_hands.HAND_CONNECTIONS)
+            print(self.startup.report())
+        return self.cap is not None
 
     def message(self, msg, color):
         mesg = self.FONT.render(msg, True, color)
@@ -173,38 +206,42 @@ class Game:
                             self.snake.y1_change = self.SNAKE_BLOCK
                             self.snake.x1_change = 0
 
-            success, img = self.cap.read()
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, mid = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list:
-                if bbox:
-                    gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                    self.recent_gestures.append(gesture[0])
-                    x, y, w, h = bbox
-                    cv2.putText(img, str(gesture[0]), (x + w + 10, y + 20), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
-
-                if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                    most_common_gesture = collections.Counter(self.recent_gestures).most_common(1)[0][0]
-
-                    if most_common_gesture == 1: # Up
-                        if self.snake.y1_change != self.SNAKE_BLOCK:
-                            self.snake.y1_change = -self.SNAKE_BLOCK
-                            self.snake.x1_change = 0
-                    elif most_common_gesture == 2: # Left
-                        if self.snake.x1_change != self.SNAKE_BLOCK:
-                            self.snake.x1_change = -self.SNAKE_BLOCK
-                            self.snake.y1_change = 0
-                    elif most_common_gesture == 3: # Down
-                        if self.snake.y1_change != -self.SNAKE_BLOCK:
-                            self.snake.y1_change = self.SNAKE_BLOCK
-                            self.snake.x1_change = 0
-                    elif most_common_gesture == 4: # Right
-                        if self.snake.x1_change != -self.SNAKE_BLOCK:
-                            self.snake.x1_change = self.SNAKE_BLOCK
-                            self.snake.y1_change = 0
+            success, img, timestamp = self.cap.latest() if self.vision_ready() else (False, None, None)
+            if success:
+                if self.scheduler.should_detect(self.clock.get_rawtime() / 1000.0):
+                    started = time.perf_counter()
+                    self.hands = self.detector.find_hands(img, draw=False, timestamp=timestamp, mirror=True)
+
+                    if self.hands:
+                        hand = self.hands[0]
+                        hand.smooth(self.landmark_filter)
+                        proba = self.gesture_evaluator.evaluate_proba(hand.landmarks, hand.handedness, hand.bbox)
+                        self.gesture_decision.update_proba(self.gesture_evaluator.classes, proba)
+                        self.captions = [f"{self.gesture_evaluator.classes[proba.argmax()]} {proba.max():.2f}"]
+
+                        current_gesture = self.gesture_decision.current
+                        if current_gesture is not None:
+                            if current_gesture == 1: # Up
+                                if self.snake.y1_change != self.SNAKE_BLOCK:
+                                    self.snake.y1_change = -self.SNAKE_BLOCK
+                                    self.snake.x1_change = 0
+                            elif current_gesture == 2: # Left
+                                if self.snake.x1_change != self.SNAKE_BLOCK:
+                                    self.snake.x1_change = -self.SNAKE_BLOCK
+                                    self.snake.y1_change = 0
+                            elif current_gesture == 3: # Down
+                                if self.snake.y1_change != -self.SNAKE_BLOCK:
+                                    self.snake.y1_change = self.SNAKE_BLOCK
+                                    self.snake.x1_change = 0
+                            elif current_gesture == 4: # Right
+                                if self.snake.x1_change != -self.SNAKE_BLOCK:
+                                    self.snake.x1_change = self.SNAKE_BLOCK
+                                    self.snake.y1_change = 0
+                    else:
+                        self.landmark_filter.reset()
+                        self.gesture_decision.update(None)
+                        self.captions = []
+                    self.scheduler.record(time.perf_counter() - started)
 
             if self.snake.has_collided_with_wall() or self.snake.has_collided_with_self():
                 game_close = True
@@ -217,15 +254,13 @@ class Game:
             self.SCREEN.fill(self.BLACK)
 
             if success:
-                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                img = img.swapaxes(0, 1)
-                frame = pygame.surfarray.make_surface(img)
-                frame = pygame.transform.scale(frame, (400, 300))
+                frame = self.preview.render(img, self.hands, self.captions, text=f"DET {self.scheduler.detection_rate:.0f}/s")
                 self.SCREEN.blit(frame, (self.SCREEN_WIDTH - 400, 0))
 
             self.food.draw(self.SCREEN, self.RED)
             self.snake.draw(self.SCREEN, self.GREEN)
             pygame.display.update()
+            self.startup.mark_once('first frame')
 
             if self.snake.x1 == self.food.food_x and self.snake.y1 == self.food.food_y:
                 self.food.respawn()
@@ -261,12 +296,12 @@ class Game:
             while waiting_for_input:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        self.cap.release()
+                        self.vision.close()
                         pygame.quit()
                         quit()
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_q:
-                            self.cap.release()
+                            self.vision.close()
                             pygame.quit()
                             quit()
 
@@ -277,5 +312,6 @@ class Game:
             self.food = Food(self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.SNAKE_BLOCK)
 
 if __name__ == "__main__":
-    game = Game()
+    # Optional argument: camera index or a recorded session directory to replay
+    game = Game(sys.argv[1] if len(sys.argv) > 1 else 0)
     game.run()
\ No newline at end of file
@@ -1,10 +1,11 @@
 import pygame
 import random
-import cv2
 import json
-from src.MediPipeHandsModule.HandTrackingModule import hand_detector
-from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
-import collections
+import sys
+import time
+from src.MediPipeHandsModule.InferenceScheduler import InferenceScheduler
+from src.MediPipeHandsModule.TemporalFilter import OneEuroFilter, GestureHysteresis
+from src.MediPipeHandsModule.Startup import StartupTimer, VisionLoader
 
 # --- Game Object Classes ---
 
@@ -162,24 +163,39 @@ class Platform(pygame.sprite.Group):
 # --- Game Class ---
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    # Detections per second needed for the player to feel in control
+    MIN_DETECTION_RATE = 20
 
-        self.infoObject = pygame.display.Info()
-        self.SCREEN_WIDTH = self.infoObject.current_w
-        self.SCREEN_HEIGHT = self.infoObject.current_h
-        self.SCREEN = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.FULLSCREEN)
-        pygame.display.set_caption("Space Invaders")
+    def __init__(self, source=0):
+        self.startup = StartupTimer()
+        with self.startup.stage('pygame init + display'):
+            pygame.init()
+
+            self.infoObject = pygame.display.Info()
+            self.SCREEN_WIDTH = self.infoObject.current_w
+            self.SCREEN_HEIGHT = self.infoObject.current_h
+            self.SCREEN = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.FULLSCREEN)
+            pygame.display.set_caption("Space Invaders")
 
         self.BLACK = (0, 0, 0)
         self.WHITE = (255, 255, 255)
 
         self.FONT = pygame.font.SysFont(None, 50)
 
-        self.cap = cv2.VideoCapture(0)
-        self.detector = hand_detector(max_hands=1, track_con=0.8)
-        self.gesture_evaluator = GestureEvaluator("models/gesture_model.pkl")
-        self.recent_gestures = collections.deque(maxlen=5)
+        # Camera, detector and classifier come up in the background, the game
+        # starts with keyboard controls until they are ready
+        self.vision = VisionLoader(source,
+                                   detector_args=dict(max_hands=1, track_con=0.8, roi_tracking=True),
+                                   evaluator_args=dict(cache_step=0.02),
+                                   timer=self.startup)
+        self.cap = None
+        self.detector = None
+        self.gesture_evaluator = None
+        self.preview = None
+        self.vision_failed = False
+        self.landmark_filter = OneEuroFilter()
+        self.gesture_decision = GestureHysteresis()
+        self.hands = []
 
         self.player = Player(self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
         self.all_sprites = pygame.sprite.Group()
@@ -209,6 +225,22 @@ class Game:
         self.has_shield = False
 
         self.clock = pygame.time.Clock()
+        self.scheduler = InferenceScheduler(target_fps=60, min_rate=self.MIN_DETECTION_RATE)
+
+    def vision_ready(self):
+        """Takes over the camera, detector and classifier once the loader has them."""
+        if self.cap is None and self.vision.ready() and not self.vision_failed:
+            if self.vision.error is not None:
+                # Reported once, the game stays on keyboard control
+                print(f'Gesture control unavailable, use the keyboard: {self.vision.error}')
+                self.vision_failed = True
+                return False
+            self.cap, self.detector, self.gesture_evaluator = self.vision.result()
+            # cv2 is already imported by the loader at this point
+            from src.MediPipeHandsModule.CameraPreview import CameraPreview
+            self.preview = CameraPreview(connections=self.detector.mp_hands.HAND_CONNECTIONS)
+            print(self.startup.report())
+        return self.cap is not None
 
     def create_platforms(self):
         num_platforms = 4
@@ -427,26 +459,29 @@ class Game:
                         game_over = True
 
             # --- Gesture Recognition ---
-            success, img = self.cap.read()
+            success, img, timestamp = self.cap.latest() if self.vision_ready() else (False, None, None)
             if success:
-                img = cv2.flip(img, 1)
-                img = self.detector.find_hands(img)
-                lm_list, bbox, _ = self.detector.get_bbox_location(img)
-                handedness_list = self.detector.get_handedness()
-
-                if lm_list and handedness_list:
-                    if bbox:
-                        gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                        self.recent_gestures.append(gesture[0])
-
-                if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                    most_common_gesture = collections.Counter(self.recent_gestures).most_common(1)[0][0]
-
-                    if most_common_gesture == 2:  # Left
+                if self.scheduler.should_detect(self.clock.get_rawtime() / 1000.0):
+                    started = time.perf_counter()
+                    self.hands = self.detector.find_hands(img, draw=False, timestamp=timestamp, mirror=True)
+
+                    if self.hands:
+                        hand = self.hands[0]
+                        hand.smooth(self.landmark_filter)
+                        proba = self.gesture_evaluator.evaluate_proba(hand.landmarks, hand.handedness, hand.bbox)
+                        self.gesture_decision.update_proba(self.gesture_evaluator.classes, proba)
+                    else:
+                        self.landmark_filter.reset()
+                        self.gesture_decision.update(None)
+                    self.scheduler.record(time.perf_counter() - started)
+
+                current_gesture = self.gesture_decision.current
+                if current_gesture is not None:
+                    if current_gesture == 2:  # Left
                         self.player.move_left()
-                    elif most_common_gesture == 4:  # Right
+                    elif current_gesture == 4:  # Right
                         self.player.move_right()
-                    elif most_common_gesture == 1:  # Shoot
+                    elif current_gesture == 1:  # Shoot
                         multi_shot = 'MULTI_SHOT' in self.active_powerups
                         self.player.shoot(self.all_sprites, self.bullets, multi_shot)
 
@@ -545,20 +580,19 @@ class Game:
 
             # Display webcam feed
             if success:
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                img_rgb = img_rgb.swapaxes(0, 1)
-                frame = pygame.surfarray.make_surface(img_rgb)
-                frame = pygame.transform.scale(frame, (400, 300))
+                frame = self.preview.render(img, self.hands, text=f"DET {self.scheduler.detection_rate:.0f}/s")
                 self.SCREEN.blit(frame, (self.SCREEN_WIDTH - 400, 0))
 
 
             pygame.display.update()
+            self.startup.mark_once('first frame')
             self.clock.tick(60)
 
-        self.cap.release()
+        self.vision.close()
         pygame.quit()
         quit()
 
 if __name__ == "__main__":
-    game = Game()
+    # Optional argument: camera index or a recorded session directory to replay
+    game = Game(sys.argv[1] if len(sys.argv) > 1 else 0)
     game.run()
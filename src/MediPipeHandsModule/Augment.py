@@ -0,0 +1,128 @@
+import numpy as np
+
+from src.MediPipeHandsModule.Features import NUM_FEATURES, NUM_LANDMARKS
+
+
+class LandmarkAugmenter:
+    """
+    Makes extra training samples from the (n, 43) feature rows of Features.py,
+    whole arrays at a time, so augmented data is generated while training
+    instead of being written to the dataset.
+
+    Every random variant of a row is stretched in width against height,
+    rotated about the wrist and has noise added to the landmarks (the wrist
+    stays at the origin), and with
+    probability swap_handedness it is mirrored into a synthetic sample of the
+    other hand. Separately, mirror remaps labels: rows of a label in it are
+    mirrored into samples of another gesture (2 -> 4 like add_gesture_4.py
+    did), keeping their hand.
+
+    Any of rotate, scale, noise and swap_handedness can be set per label
+    through per_label, e.g. {3: {'rotate': 0}} for a gesture whose angle
+    matters.
+    """
+
+    PARAMS = ('rotate', 'scale', 'noise', 'swap_handedness')
+
+    def __init__(self, rotate=10.0, scale=0.1, noise=0.01, swap_handedness=0.0, mirror=None, per_label=None, seed=None):
+        """
+        Args:
+            rotate: Largest rotation in degrees, either way.
+            scale: Largest relative change of the hand's width against its
+                height, either way. A uniform change in size would make no
+                difference, the features are divided by the hand's own bbox.
+            noise: Standard deviation of the noise added to each coordinate.
+            swap_handedness: Probability that a variant becomes the other hand.
+            mirror: {label: mirrored label}.
+            per_label: {label: {param: value}} overriding the above.
+            seed: For reproducible variants.
+        """
+        self.defaults = dict(rotate=rotate, scale=scale, noise=noise, swap_handedness=swap_handedness)
+        self.mirror_labels = dict(mirror or {})
+        self.per_label = dict(per_label or {})
+        for label, params in self.per_label.items():
+            unknown = set(params) - set(self.PARAMS)
+            if unknown:
+                raise ValueError(f"Unknown augmentation {', '.join(sorted(unknown))} for label {label}, "
+                                 f"choose from {', '.join(self.PARAMS)}")
+        self.rng = np.random.default_rng(seed)
+
+    def _per_row(self, name, y):
+        values = np.full(len(y), self.defaults[name], dtype=np.float64)
+        for label, params in self.per_label.items():
+            if name in params:
+                values[y == label] = params[name]
+        return values
+
+    def mirror(self, X, y):
+        """
+        Returns:
+            (X, y) of the mirrored rows only, for the labels in mirror.
+        """
+        y = np.asarray(y)
+        rows = np.flatnonzero(np.isin(y, list(self.mirror_labels)))
+        X = np.array(X[rows], dtype=np.float32)
+        X[:, 1::2] *= -1
+        if not len(rows):
+            return X, y[:0]
+        return X, np.array([self.mirror_labels[label] for label in y[rows].tolist()])
+
+    def variants(self, X, y, copies=1):
+        """
+        The features are divided by the bbox width and height separately and
+        the bbox's aspect isn't kept, so the rotation treats the hand as if
+        its bbox had been square: a hand whose bbox wasn't comes out slightly
+        sheared, one more reason to keep rotate small. Afterwards each axis
+        is rescaled to the row's original extent, the way normalizing by the
+        stretched and rotated hand's own bbox would, so variants stay within
+        the range of features the runtime produces.
+
+        Returns:
+            (X, y) with copies random variants of every row.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        if copies > 1:
+            X, y = np.tile(X, (copies, 1)), np.tile(y, copies)
+        n = len(X)
+        out = np.empty((n, NUM_FEATURES), dtype=np.float32)
+        landmarks = X[:, 1:].reshape(n, NUM_LANDMARKS, 2).astype(np.float64)
+
+        angle = np.deg2rad(self._per_row('rotate', y)) * self.rng.uniform(-1.0, 1.0, n)
+        stretch = 1.0 + self._per_row('scale', y) * self.rng.uniform(-1.0, 1.0, n)
+        cos, sin = np.cos(angle)[:, np.newaxis], np.sin(angle)[:, np.newaxis]
+        x, v = landmarks[..., 0] * stretch[:, np.newaxis], landmarks[..., 1]
+        points = out[:, 1:].reshape(n, NUM_LANDMARKS, 2)
+        rotated = np.stack([cos * x - sin * v, sin * x + cos * v], axis=-1)
+        extent = np.ptp(landmarks, axis=1)
+        rotated_extent = np.ptp(rotated, axis=1)
+        fit = np.divide(extent, rotated_extent, out=np.ones_like(extent), where=rotated_extent > 0)
+        points[:] = rotated * fit[:, np.newaxis, :]
+        points[:, 1:] += self.rng.normal(size=(n, NUM_LANDMARKS - 1, 2)) * self._per_row('noise', y)[:, np.newaxis, np.newaxis]
+
+        # Mirroring a hand makes it look like the other one
+        out[:, 0] = X[:, 0]
+        swap = self.rng.random(n) < self._per_row('swap_handedness', y)
+        points[swap, :, 0] *= -1
+        out[swap, 0] = 1 - out[swap, 0]
+        return out, y
+
+    def augment(self, X, y, copies=1):
+        """
+        Returns:
+            (X, y) with the original rows, their mirrored rows and copies
+            random variants of both.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        mirrored_X, mirrored_y = self.mirror(X, y)
+        X, y = np.concatenate([X, mirrored_X]), np.concatenate([y, mirrored_y])
+        if copies < 1:
+            return X, y
+        variant_X, variant_y = self.variants(X, y, copies)
+        return np.concatenate([X, variant_X]), np.concatenate([y, variant_y])
+
+    def epochs(self, X, y, count, copies=1):
+        """Yields a freshly augmented (X, y) for each of count epochs."""
+        for _ in range(count):
+            yield self.augment(X, y, copies)
@@ -0,0 +1,264 @@
+import os
+import time
+
+import joblib
+import numpy as np
+
+from src.MediPipeHandsModule.CompiledForest import CompiledForest, is_forest
+from src.MediPipeHandsModule.Features import HANDEDNESS_CODES, NUM_LANDMARKS
+from src.MediPipeHandsModule.GestureDataset import load_table
+from src.MediPipeHandsModule.IndexedKNN import IndexedKNN
+from src.MediPipeHandsModule.ModelArtifact import is_artifact, load_artifact
+from src.MediPipeHandsModule.NumpyCNN import NumpyCNN
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+MODELS_PATH = os.path.join(PROJECT_ROOT, 'models')
+
+# Backend name -> (loader kind, model file(s) in models/). An artifact
+# directory models/<name>/ (scripts/export_artifact.py) takes precedence.
+CANDIDATES = {
+    'forest': ('forest', 'gesture_model.pkl'),
+    'knn': ('knn', 'gesture_model_knn.npz'),
+    'cnn': ('cnn', 'gesture_model_cnn.npz'),
+    'left_right': ('routed', ('random_forest_left.pkl', 'random_forest_right.pkl')),
+}
+
+# Samples the candidates are scored on when picking one automatically: the
+# rows train.py held out of the forest's training, else (biased towards the
+# forest, which was trained on it) the capture data itself
+HOLDOUT_PATH = os.path.join(MODELS_PATH, 'holdout.npz')
+SAMPLES_PATH = os.path.join(PROJECT_ROOT, 'data', 'retro', 'gestures.csv')
+
+# Loader kind -> function(path) returning a model with predict, predict_proba
+# and classes_ that takes the (n, 43) features from Features.py
+LOADERS = {}
+
+
+def register_loader(kind):
+    def decorator(loader):
+        LOADERS[kind] = loader
+        return loader
+    return decorator
+
+
+@register_loader('sklearn')
+def load_sklearn(path):
+    return joblib.load(path)
+
+
+@register_loader('artifact')
+def load_artifact_dir(path):
+    return load_artifact(path)
+
+
+@register_loader('forest')
+def load_forest(path):
+    if is_artifact(path):
+        return load_artifact(path)
+    if path.endswith('.npz'):
+        return CompiledForest.load(path)
+    model = joblib.load(path)
+    return CompiledForest.from_sklearn(model) if is_forest(model) else model
+
+
+@register_loader('knn')
+def load_knn(path):
+    if path.endswith('.npz') and os.path.exists(path):
+        return IndexedKNN.load(path)
+    # Not exported by train_knn.py yet, index the pickled sklearn model instead
+    pkl_path = os.path.splitext(path)[0] + '.pkl'
+    return IndexedKNN.from_sklearn(joblib.load(pkl_path))
+
+
+@register_loader('cnn')
+def load_cnn(path):
+    # Only the exported weights: a pickled torch model needs torch, and the
+    # committed one can't even be unpickled outside the script that saved it
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'{path} not found, export the CNN with scripts/export_cnn.py '
+                                f'(or train it with scripts/train_cnn.py)')
+    return NumpyCNN.load(path)
+
+
+@register_loader('routed')
+def load_routed(paths):
+    models = []
+    for hand, path in zip(HANDEDNESS_CODES, paths):
+        if path.endswith('.pkl'):
+            # Checked before compiling, the compiled forest no longer knows its input size
+            model = joblib.load(path)
+            check_hand_model(hand, model, path)
+            models.append(CompiledForest.from_sklearn(model) if is_forest(model) else model)
+        else:
+            models.append(load_forest(path))
+    return HandRouter(*models)
+
+
+def check_hand_model(hand, model, path=None):
+    """
+    Raises ValueError unless model fits HandRouter: 42 landmark values in,
+    at least two gestures out.
+    """
+    where = f' ({path})' if path else ''
+    n_features = getattr(model, 'n_features_in_', None)
+    if n_features is not None and n_features != 2 * NUM_LANDMARKS:
+        raise ValueError(f'The {hand} hand model{where} takes {n_features} features instead of '
+                         f'{2 * NUM_LANDMARKS}, retrain with scripts/train_hands.py')
+    if len(model.classes_) < 2:
+        raise ValueError(f'The {hand} hand model{where} only knows gesture(s) {list(model.classes_)}, '
+                         f'retrain with scripts/train_hands.py')
+
+
+class CNNBackend:
+    """
+    The torch CNN (CNNModel.CNN) behind the predict/predict_proba interface,
+    for training scripts that have torch loaded anyway. classes gives the
+    gesture label of each output, the output indices themselves are
+    LabelEncoder codes, not gestures.
+    """
+
+    def __init__(self, model, classes):
+        import torch
+        self.torch = torch
+        self.model = model
+        self.model.eval()
+        self.classes_ = np.asarray(classes)
+        if len(self.classes_) != model.fc2.out_features:
+            raise ValueError(f'{len(self.classes_)} labels for {model.fc2.out_features} CNN outputs')
+
+    def predict_proba(self, X):
+        torch = self.torch
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        landmarks = torch.from_numpy(X[:, 1:].reshape(-1, 1, 6, 7))
+        handedness = torch.from_numpy(X[:, :1])
+        with torch.no_grad():
+            return torch.softmax(self.model(landmarks, handedness), dim=1).numpy()
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+class HandRouter:
+    """
+    Sends each row to the model of its hand (feature 0: 0=left, 1=right).
+    The per-hand models take the 42 landmark values without handedness.
+    """
+
+    def __init__(self, left, right):
+        for hand, model in zip(HANDEDNESS_CODES, (left, right)):
+            check_hand_model(hand, model)
+        self.models = (left, right)
+        self.classes_ = np.union1d(left.classes_, right.classes_)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        proba = np.zeros((len(X), len(self.classes_)))
+        for code, model in enumerate(self.models):
+            rows = np.flatnonzero(X[:, 0] == code)
+            if rows.size:
+                columns = np.searchsorted(self.classes_, model.classes_)
+                proba[np.ix_(rows, columns)] = model.predict_proba(X[rows, 1:])
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def load_backend(name, artifacts=True):
+    """
+    Loads one of CANDIDATES by name.
+
+    Args:
+        artifacts: Use the exported artifact models/<name>/ if there is one.
+    """
+    if name not in CANDIDATES:
+        raise ValueError(f"Unknown gesture backend '{name}', choose from {', '.join(CANDIDATES)}")
+    if artifacts and is_artifact(os.path.join(MODELS_PATH, name)):
+        return load_artifact(os.path.join(MODELS_PATH, name))
+    kind, files = CANDIDATES[name]
+    if isinstance(files, str):
+        return LOADERS[kind](os.path.join(MODELS_PATH, files))
+    return LOADERS[kind]([os.path.join(MODELS_PATH, f) for f in files])
+
+
+def save_holdout(X, y, path=HOLDOUT_PATH):
+    """Keeps rows a model was not trained on, for scoring the backends fairly."""
+    np.savez(path, X=np.asarray(X, dtype=np.float32), y=np.asarray(y))
+
+
+def load_samples(path=SAMPLES_PATH, per_class=50, seed=0):
+    """
+    Returns:
+        (features, labels) for up to per_class random rows of every label in
+        a capture.py CSV, its GestureDataset or a save_holdout file.
+    """
+    if path.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as data:
+            X, labels = data['X'], data['y']
+    else:
+        labels, X = load_table(path)
+
+    rng = np.random.default_rng(seed)
+    keep = np.concatenate([
+        rng.permutation(np.flatnonzero(labels == label))[:per_class] for label in np.unique(labels)
+    ])
+    keep.sort()
+    return X[keep], labels[keep]
+
+
+def measure(model, X, y, repeats=3):
+    """
+    Returns:
+        (accuracy on X, median seconds per single-row predict_proba call)
+    """
+    accuracy = float(np.mean(model.predict(X) == y))
+    model.predict_proba(X[:1])  # warm up
+    times = []
+    for _ in range(repeats):
+        for row in X[:100]:
+            t0 = time.perf_counter()
+            model.predict_proba(row.reshape(1, -1))
+            times.append(time.perf_counter() - t0)
+    return accuracy, float(np.median(times))
+
+
+def select_backend(names=None, min_accuracy=0.9, samples=None):
+    """
+    Benchmarks the candidate backends and picks the fastest one that is at
+    least min_accuracy accurate on the samples (the most accurate one if
+    none is).
+
+    Returns:
+        (name, model, report) where report holds one line per candidate.
+    """
+    report = []
+    if samples is None:
+        if os.path.exists(HOLDOUT_PATH):
+            samples = load_samples(HOLDOUT_PATH)
+            report.append(f'scored on {len(samples[1])} held-out rows from {os.path.basename(HOLDOUT_PATH)}')
+        else:
+            samples = load_samples()
+            report.append(f'no held-out rows ({os.path.basename(HOLDOUT_PATH)}, written by train.py), scored on '
+                          f'{os.path.basename(SAMPLES_PATH)}, which the forest was trained on')
+    X, y = samples
+    results = []
+    for name in names or CANDIDATES:
+        try:
+            model = load_backend(name)
+            accuracy, latency = measure(model, X, y)
+        except Exception as e:
+            # Missing files or optional dependencies (torch) rule a candidate out
+            report.append(f"{name:>10}: unavailable ({e})")
+            continue
+        results.append((name, model, accuracy, latency))
+        report.append(f"{name:>10}: accuracy {accuracy * 100:5.1f}%, {latency * 1000:.3f} ms per call")
+    if not results:
+        raise RuntimeError('No gesture backend could be loaded:\n' + '\n'.join(report))
+
+    good = [r for r in results if r[2] >= min_accuracy]
+    if good:
+        name, model, _, _ = min(good, key=lambda r: r[3])
+    else:
+        name, model, _, _ = max(results, key=lambda r: r[2])
+    report.append(f"selected '{name}'")
+    return name, model, report
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+import pygame
+
+
+class CameraPreview:
+    """
+    Turns camera frames into the small webcam preview the games show.
+
+    The frame is shrunk first and every other step (mirroring, BGR->RGB,
+    drawing the hands) works on the small image, which is then written into
+    one Surface that is reused every frame.
+    """
+
+    def __init__(self, size=(400, 300), mirror=True, connections=()):
+        """
+        Args:
+            size: (width, height) of the preview.
+            mirror: Show the frame flipped horizontally, like a mirror. Hands
+                passed to render must then come from find_hands(mirror=True).
+            connections: Landmark index pairs to draw as lines, e.g.
+                detector.mp_hands.HAND_CONNECTIONS.
+        """
+        self.size = size
+        self.mirror = mirror
+        self.connections = list(connections)
+        width, height = size
+        self.small = np.empty((height, width, 3), dtype=np.uint8)
+        self.flipped = np.empty((height, width, 3), dtype=np.uint8)
+        self.rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self.surface = pygame.Surface(size)
+
+    def render(self, img, hands=(), captions=(), text=None):
+        """
+        Args:
+            img: The raw BGR camera frame (not modified).
+            hands: HandResults to draw, in the frame's (mirrored) pixel space.
+            captions: Optional text per hand, drawn next to its bbox.
+            text: Optional status line for the top left corner.
+
+        Returns:
+            The preview Surface. It is overwritten by the next call.
+        """
+        frame_h, frame_w = img.shape[:2]
+        cv2.resize(img, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        src = self.small
+        if self.mirror:
+            cv2.flip(self.small, 1, dst=self.flipped)
+            src = self.flipped
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self.rgb)
+
+        scale = np.array((self.size[0] / frame_w, self.size[1] / frame_h))
+        for i, hand in enumerate(hands):
+            points = (hand.landmarks * scale).astype(np.int32).tolist()
+            for a, b in self.connections:
+                cv2.line(self.rgb, points[a], points[b], (255, 255, 255), 1)
+            for point in points:
+                cv2.circle(self.rgb, point, 2, (255, 0, 0), -1)
+
+            x, y, w, h = hand.bbox
+            x0, y0 = int(x * scale[0]), int(y * scale[1])
+            x1, y1 = int((x + w) * scale[0]), int((y + h) * scale[1])
+            cv2.rectangle(self.rgb, (x0, y0), (x1, y1), (0, 0, 255), 1)
+            if i < len(captions):
+                cv2.putText(self.rgb, str(captions[i]), (x1 + 5, y0 + 15), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 0), 1)
+
+        if text:
+            cv2.putText(self.rgb, text, (5, 15), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 0), 1)
+
+        pygame.surfarray.blit_array(self.surface, self.rgb.swapaxes(0, 1))
+        return self.surface
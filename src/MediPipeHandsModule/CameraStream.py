@@ -0,0 +1,66 @@
+import collections
+import threading
+import time
+
+from src.MediPipeHandsModule.SessionRecorder import open_source
+
+
+class CameraStream:
+    """
+    Owns a cv2.VideoCapture and reads it on a background thread.
+
+    Only the newest frames are kept (in a small ring buffer, together with the
+    time they were captured), so a slow game frame never leaves stale frames
+    queued up for the next one.
+    """
+
+    def __init__(self, source=0, buffer_size=2):
+        """
+        Args:
+            source: Device index, recorded session directory, video path, or
+                an already opened capture (see SessionRecorder.open_source).
+            buffer_size: How many of the newest frames to keep.
+        """
+        self.cap = open_source(source)
+        self.frames = collections.deque(maxlen=buffer_size)
+        self.lock = threading.Lock()
+        self.running = True
+        self.thread = threading.Thread(target=self._reader, name="CameraStream", daemon=True)
+        self.thread.start()
+
+    def _reader(self):
+        while self.running:
+            success, img = self.cap.read()
+            timestamp = time.perf_counter()
+            if not success:
+                # Device went away or is not ready yet, don't spin the CPU
+                time.sleep(0.01)
+                continue
+            with self.lock:
+                self.frames.append((img, timestamp))
+
+    def latest(self):
+        """
+        Returns the newest frame without waiting for the camera.
+
+        Returns:
+            (success, img, timestamp) where timestamp is the time.perf_counter()
+            value at capture. success is False until the first frame arrives.
+        """
+        with self.lock:
+            if not self.frames:
+                return False, None, None
+            img, timestamp = self.frames[-1]
+        return True, img, timestamp
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def release(self):
+        self.running = False
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        self.cap.release()
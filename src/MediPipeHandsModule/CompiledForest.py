@@ -0,0 +1,139 @@
+import numpy as np
+
+
+class CompiledForest:
+    """
+    A trained sklearn random forest packed into flat NumPy arrays.
+
+    Every tree's nodes are stored back to back in the same arrays (feature,
+    threshold, left/right child as global node indices, class probabilities
+    per node). Leaves point at themselves, so all trees are walked at once
+    for a fixed number of steps (the deepest tree's depth) with a handful of
+    array operations per step, instead of sklearn's input validation and
+    per-tree dispatch on every call.
+
+    Predictions match the forest's exactly: features are compared as float32
+    against the float64 thresholds like sklearn does, and the per-tree
+    probabilities are summed in tree order before averaging.
+    """
+
+    ARTIFACT_KIND = 'forest'
+
+    def __init__(self, feature, threshold, left, right, proba, roots, depth, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.proba = proba
+        self.roots = roots
+        self.depth = int(depth)
+        self.classes_ = classes
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """
+        Args:
+            forest: A fitted RandomForestClassifier (or ExtraTreesClassifier)
+                with a single output.
+        """
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError('Only single output forests can be compiled')
+        n_classes = len(forest.classes_)
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n)
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = np.array(tree.value[:, 0, :n_classes], dtype=np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset))
+            probas.append(proba)
+            roots.append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            proba=np.concatenate(probas),
+            roots=np.array(roots, dtype=np.intp),
+            depth=depth,
+            classes=np.asarray(forest.classes_),
+        )
+
+    def artifact_arrays(self):
+        """The arrays and scalar parameters that describe the forest (see ModelArtifact)."""
+        arrays = dict(feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                      proba=self.proba, roots=self.roots)
+        return arrays, {'depth': self.depth}
+
+    @classmethod
+    def from_artifact(cls, arrays, params, classes):
+        # astype without copy keeps memory-mapped arrays mapped
+        return cls(
+            feature=arrays['feature'].astype(np.intp, copy=False),
+            threshold=arrays['threshold'],
+            left=arrays['left'].astype(np.intp, copy=False),
+            right=arrays['right'].astype(np.intp, copy=False),
+            proba=arrays['proba'],
+            roots=arrays['roots'].astype(np.intp, copy=False),
+            depth=params['depth'],
+            classes=np.asarray(classes),
+        )
+
+    def save(self, path):
+        arrays, params = self.artifact_arrays()
+        np.savez(path, classes=self.classes_, **arrays, **params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_artifact(data, {'depth': data['depth']}, data['classes'])
+
+    def apply(self, X):
+        """
+        Args:
+            X: (n_samples, n_features) features, converted to float32.
+
+        Returns:
+            (n_samples, n_trees) index of the leaf each sample ends in per tree.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # cumsum adds tree after tree like the forest does, a plain sum may
+        # add pairwise and round differently
+        proba = np.cumsum(self.proba[leaves], axis=1)[:, -1]
+        proba /= self.roots.size
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def is_forest(model):
+    """True for sklearn forest classifiers that CompiledForest can pack."""
+    estimators = getattr(model, 'estimators_', None)
+    return bool(estimators) and hasattr(estimators[0], 'tree_') and hasattr(model, 'classes_')
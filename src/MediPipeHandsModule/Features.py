@@ -0,0 +1,105 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+NUM_FEATURES = 1 + 2 * NUM_LANDMARKS  # handedness + (x, y) per landmark
+FEATURE_NAMES = ['handedness'] + [f'{axis}{i}' for i in range(NUM_LANDMARKS) for axis in 'xy']
+
+# Encode handedness: 'Left' to 0, 'Right' to 1, everywhere (capture, training, inference)
+HANDEDNESS_CODES = {'left': 0, 'right': 1}
+
+
+def encode_handedness(handedness):
+    """
+    Args:
+        handedness: A label ('Left'/'left'/'Right'/'right') or a sequence of them.
+
+    Returns:
+        0 or 1 for a single label, a float32 array for a sequence.
+    """
+    if isinstance(handedness, str):
+        return HANDEDNESS_CODES[handedness.lower()]
+    return np.fromiter((HANDEDNESS_CODES[str(h).lower()] for h in handedness), dtype=np.float32)
+
+
+def as_landmark_array(landmarks):
+    """
+    Accepts a (21, 2) / (N, 21, 2) array or the old [[id, x, y], ...] list and
+    returns the (x, y) coordinates as float64.
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.shape[-1] == 3:
+        landmarks = landmarks[..., 1:]
+    return landmarks
+
+
+def normalize_landmarks(landmarks, bbox, out=None):
+    """
+    Gets each landmark's position relative to the wrist (landmark 0), scaled
+    by the bbox width and height.
+
+    Args:
+        landmarks: (21, 2) or (N, 21, 2) pixel coordinates (or an lm_list).
+        bbox: (x, y, w, h) or an (N, 4) array of them.
+        out: Optional output array of the same shape as the landmarks.
+
+    Returns:
+        The normalized (..., 21, 2) landmarks.
+    """
+    landmarks = as_landmark_array(landmarks)
+    size = np.asarray(bbox, dtype=np.float64)[..., None, 2:4]
+    # Computed in float64 like the old per-joint loop, then stored in out's dtype
+    return np.divide(landmarks - landmarks[..., :1, :], size, out=out)
+
+
+def extract_features(landmarks, handedness, bbox, out=None):
+    """
+    Builds the model input for one hand.
+
+    Returns:
+        A contiguous float32 vector: [handedness, x0, y0, x1, y1, ..., x20, y20].
+    """
+    if out is None:
+        out = np.empty(NUM_FEATURES, dtype=np.float32)
+    out[0] = encode_handedness(handedness)
+    normalize_landmarks(landmarks, bbox, out=out[1:].reshape(NUM_LANDMARKS, 2))
+    return out
+
+
+def extract_features_batch(landmarks, handedness, bboxes, out=None):
+    """
+    Builds the model input for several hands at once.
+
+    Args:
+        landmarks: (N, 21, 2) pixel coordinates.
+        handedness: N labels.
+        bboxes: (N, 4) bboxes.
+
+    Returns:
+        A contiguous (N, 43) float32 matrix.
+    """
+    landmarks = as_landmark_array(landmarks)
+    n = landmarks.shape[0]
+    if out is None:
+        out = np.empty((n, NUM_FEATURES), dtype=np.float32)
+    out[:, 0] = encode_handedness(handedness)
+    normalize_landmarks(landmarks, bboxes, out=out[:, 1:].reshape(n, NUM_LANDMARKS, 2))
+    return out
+
+
+def features_from_table(handedness, normalized):
+    """
+    Training-side counterpart of extract_features, for rows that were saved
+    already normalized (the CSV datasets).
+
+    Args:
+        handedness: N labels as stored ('left'/'right').
+        normalized: (N, 42) normalized landmark values.
+
+    Returns:
+        A contiguous (N, 43) float32 matrix.
+    """
+    normalized = np.asarray(normalized, dtype=np.float32)
+    out = np.empty((normalized.shape[0], NUM_FEATURES), dtype=np.float32)
+    out[:, 0] = encode_handedness(handedness)
+    out[:, 1:] = normalized
+    return out
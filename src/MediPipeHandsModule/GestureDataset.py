@@ -0,0 +1,359 @@
+import csv
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from src.MediPipeHandsModule.Features import HANDEDNESS_CODES, NUM_FEATURES, NUM_LANDMARKS
+
+DATASET_VERSION = 1
+
+# Per-row arrays of a segment: name -> (dtype, shape of one row)
+COLUMNS = {
+    'labels': (np.int32, ()),
+    'handedness': (np.int8, ()),
+    'landmarks': (np.float32, (2 * NUM_LANDMARKS,)),
+}
+
+
+def parse_label(value):
+    # The CSVs store the gesture numbers as text
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+class GestureDataset:
+    """
+    Captured gesture samples as binary arrays instead of an append-only CSV.
+
+    A dataset is a directory:
+        index.json                 format version, label table, segment list
+        <segment>.labels.npy       (n,) int32 index into the label table
+        <segment>.handedness.npy   (n,) int8, 0=left 1=right
+        <segment>.landmarks.npy    (n, 42) float32 normalized landmarks
+
+    Appended rows are kept in memory and written as a new segment every
+    `chunk` rows and on flush()/close(). Loading memory-maps the segments,
+    so it costs a few file opens instead of parsing every row as text.
+    """
+
+    def __init__(self, path, chunk=1024):
+        self.path = path
+        self.chunk = chunk
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(self.index_path):
+            self.index = read_index(path)
+        else:
+            self.index = {'version': DATASET_VERSION, 'labels': [], 'segments': []}
+        self.label_codes = {label: i for i, label in enumerate(self.index['labels'])}
+        self.pending = {name: [] for name in COLUMNS}
+        self.pending_rows = 0
+
+    @property
+    def index_path(self):
+        return os.path.join(self.path, 'index.json')
+
+    def __len__(self):
+        return sum(s['rows'] for s in self.index['segments']) + self.pending_rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _label_code(self, label):
+        if isinstance(label, np.generic):
+            label = label.item()
+        code = self.label_codes.get(label)
+        if code is None:
+            code = self.label_codes[label] = len(self.index['labels'])
+            self.index['labels'].append(label)
+        return code
+
+    def append(self, label, handedness, landmarks):
+        """
+        Args:
+            label: The gesture label.
+            handedness: 'left'/'right' (any case) or its code.
+            landmarks: The 42 normalized values, (42,) or (21, 2).
+        """
+        self.extend([label], [handedness], np.reshape(landmarks, (1, -1)))
+
+    def extend(self, labels, handedness, landmarks):
+        """Appends several rows, same arguments as append with one entry per row."""
+        landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, 2 * NUM_LANDMARKS)
+        if not len(labels) == len(handedness) == len(landmarks):
+            raise ValueError(f'{len(labels)} labels, {len(handedness)} handedness values '
+                             f'and {len(landmarks)} landmark rows')
+        self.pending['labels'].append(np.fromiter((self._label_code(l) for l in labels), dtype=np.int32))
+        self.pending['handedness'].append(np.fromiter(
+            (HANDEDNESS_CODES[h.lower()] if isinstance(h, str) else h for h in handedness), dtype=np.int8))
+        self.pending['landmarks'].append(landmarks)
+        self.pending_rows += len(landmarks)
+        if self.pending_rows >= self.chunk:
+            self.flush()
+
+    def _next_segment(self):
+        return f"{max((int(s['name']) for s in self.index['segments']), default=-1) + 1:05d}"
+
+    def _write_pending(self, segment):
+        for name, (dtype, _) in COLUMNS.items():
+            array = np.concatenate(self.pending[name]).astype(dtype, copy=False)
+            np.save(os.path.join(self.path, f'{segment}.{name}.npy'), array, allow_pickle=False)
+            self.pending[name] = []
+        self.index['segments'].append({'name': segment, 'rows': self.pending_rows})
+        self.pending_rows = 0
+        self._write_index()
+
+    def flush(self):
+        """Writes the pending rows as a new segment."""
+        if self.pending_rows:
+            self._write_pending(self._next_segment())
+
+    def _write_index(self):
+        # Replaced in one step, a reader never sees a half-written index
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self):
+        self.flush()
+
+    def arrays(self, mmap=True, start=0):
+        """
+        Args:
+            start: First row to return, rows are never reordered so a row
+                count doubles as a watermark of what was already seen.
+
+        Returns:
+            (labels, handedness, landmarks) of the written rows: the label
+            values, the (n,) handedness codes and the (n, 42) landmarks.
+            With a single segment these are read-only memory maps.
+        """
+        mmap_mode = 'r' if mmap else None
+        columns = {name: [] for name in COLUMNS}
+        offset = 0
+        for segment in self.index['segments']:
+            offset += segment['rows']
+            if offset <= start:
+                continue
+            skip = max(start - (offset - segment['rows']), 0)
+            for name in COLUMNS:
+                array = np.load(os.path.join(self.path, f'{segment["name"]}.{name}.npy'),
+                                mmap_mode=mmap_mode, allow_pickle=False)
+                columns[name].append(array[skip:])
+        out = []
+        for name, (dtype, shape) in COLUMNS.items():
+            parts = columns[name]
+            if not parts:
+                out.append(np.empty((0,) + shape, dtype=dtype))
+            else:
+                out.append(parts[0] if len(parts) == 1 else np.concatenate(parts))
+        codes, handedness, landmarks = out
+        return np.asarray(self.index['labels']).take(codes), handedness, landmarks
+
+    def features(self, start=0):
+        """
+        Returns:
+            (labels, features) with the (n, 43) float32 features of Features.py,
+            from row start on.
+        """
+        labels, handedness, landmarks = self.arrays(start=start)
+        X = np.empty((len(labels), NUM_FEATURES), dtype=np.float32)
+        X[:, 0] = handedness
+        X[:, 1:] = landmarks
+        return labels, X
+
+    def compact(self):
+        """Merges all segments into one, so loading is a plain memory map again."""
+        self.flush()
+        if len(self.index['segments']) <= 1:
+            return
+        arrays = dict(zip(COLUMNS, self.arrays(mmap=False)))
+        arrays['labels'] = np.fromiter((self.label_codes[l] for l in arrays['labels'].tolist()), dtype=np.int32)
+        old = [s['name'] for s in self.index['segments']]
+        # Written under a new name and listed alone in the index before the old
+        # segments are removed, so an interrupted compact loses nothing
+        merged = self._next_segment()
+        self.index['segments'] = []
+        self.pending = {name: [arrays[name]] for name in COLUMNS}
+        self.pending_rows = len(arrays['labels'])
+        self._write_pending(merged)
+        for segment in old:
+            for name in COLUMNS:
+                os.remove(os.path.join(self.path, f'{segment}.{name}.npy'))
+
+
+class DatasetWriter:
+    """
+    Appends batches to a GestureDataset on a background thread, so capture
+    never waits on the disk. Each batch is flushed as its own segment once
+    written; close() merges them back into one.
+    """
+
+    def __init__(self, dataset, compact=True):
+        self.dataset = dataset
+        self.compact = compact
+        self.written = 0
+        self.error = None
+        self.batches = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="DatasetWriter", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                break
+            try:
+                self.dataset.extend(*batch)
+                self.dataset.flush()
+                self.written += len(batch[0])
+            except Exception as e:
+                # Kept for close(), the capture loop shouldn't die mid-burst
+                self.error = e
+
+    def put(self, labels, handedness, landmarks):
+        """Queues rows for writing, same arguments as GestureDataset.extend."""
+        if labels:
+            self.batches.put((list(labels), list(handedness), np.array(landmarks, dtype=np.float32)))
+
+    def close(self):
+        """Writes what is queued, then compacts the dataset."""
+        self.batches.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError(f'Writing to {self.dataset.path} failed: {self.error}') from self.error
+        self.dataset.close()
+        if self.compact:
+            self.dataset.compact()
+
+
+def read_index(path):
+    with open(os.path.join(path, 'index.json'), 'r') as f:
+        index = json.load(f)
+    if index.get('version') != DATASET_VERSION:
+        raise ValueError(f"Unsupported gesture dataset version {index.get('version')} in {path}")
+    return index
+
+
+def is_dataset(path):
+    return os.path.isfile(os.path.join(path, 'index.json'))
+
+
+def dataset_path(csv_path):
+    """The dataset directory that replaces a capture CSV: data/retro/gestures.csv -> data/retro/gestures/."""
+    return os.path.splitext(csv_path)[0]
+
+
+def read_csv_rows(path, handedness=None):
+    """
+    Parses a capture CSV: label, handedness, 42 landmark values per row, or
+    label and 42 values when the file holds one hand only (left.csv /
+    right.csv) and handedness is given. Malformed rows are skipped.
+
+    Returns:
+        (labels, handedness, (n, 42) float32 landmarks, skipped row count)
+    """
+    labels, hands, values = [], [], []
+    skipped = 0
+    with open(path, 'r') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            if len(row) > 1 and row[1].lower() in HANDEDNESS_CODES:
+                label, hand, data = row[0], row[1], row[2:]
+            elif handedness is not None:
+                label, hand, data = row[0], handedness, row[1:]
+            else:
+                skipped += 1
+                continue
+            if len(data) != 2 * NUM_LANDMARKS:
+                skipped += 1
+                continue
+            try:
+                values.append([float(v) for v in data])
+            except ValueError:
+                skipped += 1
+                continue
+            labels.append(parse_label(label))
+            hands.append(hand)
+    landmarks = np.array(values, dtype=np.float32).reshape(-1, 2 * NUM_LANDMARKS)
+    return labels, hands, landmarks, skipped
+
+
+def import_csv(csv_path, path=None, handedness=None):
+    """
+    Copies a capture CSV into a new dataset directory, by default the one
+    next to it (dataset_path).
+
+    Returns:
+        (dataset, imported row count, skipped row count), the dataset is None
+        if the CSV has no rows.
+    """
+    labels, hands, landmarks, skipped = read_csv_rows(csv_path, handedness)
+    if not labels:
+        return None, 0, skipped
+    dataset = GestureDataset(path or dataset_path(csv_path), chunk=max(len(labels), 1))
+    dataset.extend(labels, hands, landmarks)
+    dataset.close()
+    return dataset, len(labels), skipped
+
+
+def open_dataset(csv_path):
+    """
+    Opens the dataset that replaces a capture CSV for appending, importing
+    the CSV first if there is no dataset yet so no earlier rows are lost.
+    """
+    path = dataset_path(csv_path)
+    if not is_dataset(path) and os.path.exists(csv_path):
+        import_csv(csv_path, path)
+    return GestureDataset(path)
+
+
+def load_table(path, start=0):
+    """
+    Loads training data from a dataset directory or a capture CSV. For a CSV
+    the dataset directory next to it is used instead once it exists (see
+    scripts/import_csv.py).
+
+    Args:
+        start: Skip the rows before this one.
+
+    Returns:
+        (labels, features) with the (n, 43) float32 features of Features.py.
+    """
+    if path.endswith('.csv') and is_dataset(dataset_path(path)):
+        path = dataset_path(path)
+    if is_dataset(path):
+        return GestureDataset(path).features(start)
+    labels, hands, landmarks, _ = read_csv_rows(path)
+    labels, hands, landmarks = labels[start:], hands[start:], landmarks[start:]
+    X = np.empty((len(labels), NUM_FEATURES), dtype=np.float32)
+    X[:, 0] = [HANDEDNESS_CODES[h.lower()] for h in hands]
+    X[:, 1:] = landmarks
+    return np.array(labels), X
+
+
+def read_watermark(model_path):
+    """
+    The training data a model has seen, written next to it by write_watermark.
+
+    Returns:
+        {'data': file name, 'rows': row count, 'labels': label list}, or None.
+    """
+    path = os.path.splitext(model_path)[0] + '.watermark.json'
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_watermark(model_path, data_path, rows, labels):
+    """Records that the model at model_path was trained on the first rows of data_path."""
+    labels = np.unique(labels).tolist()
+    with open(os.path.splitext(model_path)[0] + '.watermark.json', 'w') as f:
+        json.dump({'data': os.path.basename(data_path), 'rows': int(rows), 'labels': labels}, f, indent=4)
@@ -1,47 +1,136 @@
-import joblib
+import os
+
 import numpy as np
 
+from src.MediPipeHandsModule import Backends
+from src.MediPipeHandsModule.Features import NUM_FEATURES, extract_features, extract_features_batch
+from src.MediPipeHandsModule.HandResult import stack_hands
+from src.MediPipeHandsModule.PredictionCache import PredictionCache
+
 class GestureEvaluator:
-    def __init__(self, model_path):
-        self.model = joblib.load(model_path)
-
-    def _normalize_landmarks(self, lm_list, bbox):
-        normalized_landmarks = []
-        if len(lm_list) != 0 and bbox:
-            wrist = lm_list[0]  # Wrist is the first landmark
-            bbox_width = bbox[2]
-            bbox_height = bbox[3]
-            for joint in lm_list:
-                try:
-                    # Get relative position to the wrist and scale by bbox dimensions
-                    normalized_x = (joint[1] - wrist[1]) / bbox_width
-                    normalized_y = (joint[2] - wrist[2]) / bbox_height
-                    normalized_landmarks.append((normalized_x, normalized_y))
-                except (TypeError, IndexError, ZeroDivisionError) as e:
-                    print(f"Error processing joint: {joint}, error: {e}")
-        return normalized_landmarks
+    def __init__(self, model_path=None, compiled=True, cache_step=None, cache_size=256, model=None):
+        """
+        Args:
+            model_path: A pickled sklearn model, a forest saved by
+                scripts/compile_forest.py (.npz) or a model artifact
+                directory (scripts/export_artifact.py).
+            compiled: Run random forests through CompiledForest instead of
+                sklearn's predict (same predictions, much less overhead for
+                one sample).
+            cache_step: Serve repeated poses from a PredictionCache with this
+                grid size, None to run the model on every call.
+            cache_size: How many poses the cache keeps.
+            model: An already loaded backend (see Backends.py) instead of
+                model_path.
+        """
+        if model is not None:
+            self.model = model
+        elif compiled:
+            self.model = Backends.load_forest(model_path)
+        else:
+            self.model = Backends.load_sklearn(model_path)
+        self.cache = None
+        if cache_step is not None:
+            self.cache = PredictionCache(self.model, step=cache_step, capacity=cache_size)
+            self.model = self.cache
+        # One feature row, refilled on every call
+        self.features = np.empty((1, NUM_FEATURES), dtype=np.float32)
+        # Feature matrices for batched calls, by number of hands
+        self.batch_features = {}
 
-    def evaluate(self, landmarks, handedness, bbox):
+    @classmethod
+    def from_backend(cls, name=None, min_accuracy=None, **kwargs):
         """
-        Evaluates hand landmarks to determine a gesture.
+        Loads a backend registered in Backends.CANDIDATES.
+
+        Args:
+            name: Backend name, or 'auto' to benchmark the candidates on the
+                bundled samples and take the fastest accurate one. Defaults
+                to the GESTURE_BACKEND environment variable, then 'forest'.
+            min_accuracy: Accuracy floor for 'auto', defaults to the
+                GESTURE_MIN_ACCURACY environment variable, then 0.9.
+            kwargs: Passed on to GestureEvaluator (cache_step, cache_size).
         """
-        # Encode handedness: 'Left' to 0, 'Right' to 1 (consistent with training)
-        encoded_handedness = 0
-        if handedness == 'Right':
-            encoded_handedness = 1
+        if name is None:
+            name = os.environ.get('GESTURE_BACKEND', 'forest')
+        if min_accuracy is None:
+            min_accuracy = float(os.environ.get('GESTURE_MIN_ACCURACY', 0.9))
 
-        # Normalize landmarks
-        normalized_lms = self._normalize_landmarks(landmarks, bbox)
-        
-        # Flatten normalized landmarks
-        landmark_features = [item for sublist in normalized_lms for item in sublist]
+        if name == 'auto':
+            name, model, report = Backends.select_backend(min_accuracy=min_accuracy)
+            print('Gesture backends:\n' + '\n'.join(report))
+        else:
+            model = Backends.load_backend(name)
+        evaluator = cls(model=model, **kwargs)
+        evaluator.backend = name
+        return evaluator
 
-        # Combine handedness and normalized landmarks
-        features = [encoded_handedness] + landmark_features
-        
-        input_features = np.array(features).reshape(1, -1)
+    def evaluate(self, landmarks, handedness, bbox):
+        """
+        Evaluates hand landmarks to determine a gesture.
+
+        Args:
+            landmarks: (21, 2) pixel coordinates (HandResult.landmarks) or an lm_list.
+            handedness: 'Left' or 'Right'.
+            bbox: (x, y, w, h) of the hand.
+        """
+        extract_features(landmarks, handedness, bbox, out=self.features[0])
 
         # Predict gesture
-        gesture = self.model.predict(input_features)
+        gesture = self.model.predict(self.features)
 
         return gesture
+
+    @property
+    def classes(self):
+        """The gesture labels, in the order evaluate_proba returns them."""
+        return self.model.classes_
+
+    def evaluate_proba(self, landmarks, handedness, bbox):
+        """
+        Like evaluate, but returns the probability of every gesture in
+        self.classes instead of only the most likely one.
+        """
+        extract_features(landmarks, handedness, bbox, out=self.features[0])
+        return self.model.predict_proba(self.features)[0]
+
+    def _features_batch(self, landmarks, handedness, bboxes):
+        n = len(handedness)
+        if n not in self.batch_features:
+            self.batch_features[n] = np.empty((n, NUM_FEATURES), dtype=np.float32)
+        return extract_features_batch(landmarks, handedness, bboxes, out=self.batch_features[n])
+
+    def evaluate_batch(self, landmarks, handedness, bboxes):
+        """
+        Evaluates several hands with a single model call.
+
+        Args:
+            landmarks: (n, 21, 2) pixel coordinates, e.g. from stack_hands or
+                hand_detector.landmark_batch.
+            handedness: n labels.
+            bboxes: (n, 4) bboxes.
+
+        Returns:
+            (n,) gestures.
+        """
+        if len(handedness) == 0:
+            return np.empty(0, dtype=self.classes.dtype)
+        return self.model.predict(self._features_batch(landmarks, handedness, bboxes))
+
+    def evaluate_proba_batch(self, landmarks, handedness, bboxes):
+        """
+        Like evaluate_batch, but returns (n, len(self.classes)) probabilities.
+        """
+        if len(handedness) == 0:
+            return np.empty((0, len(self.classes)))
+        return self.model.predict_proba(self._features_batch(landmarks, handedness, bboxes))
+
+    def evaluate_hands(self, hands):
+        """
+        Args:
+            hands: HandResults, e.g. everything find_hands returned.
+
+        Returns:
+            (n, len(self.classes)) probabilities, one row per hand.
+        """
+        return self.evaluate_proba_batch(*stack_hands(hands))
@@ -1,51 +1,36 @@
-import joblib
 import numpy as np
-import torch
-from src.MediPipeHandsModule.CNNModel import CNN
+from src.MediPipeHandsModule import Backends
+from src.MediPipeHandsModule.Features import NUM_FEATURES, extract_features
 
 class GestureEvaluatorCNN:
     def __init__(self, model_path):
-        self.model = joblib.load(model_path)
-        self.model.eval()
-
-    def _normalize_landmarks(self, lm_list, bbox):
-        normalized_landmarks = []
-        if len(lm_list) != 0 and bbox:
-            wrist = lm_list[0]  # Wrist is the first landmark
-            bbox_width = bbox[2]
-            bbox_height = bbox[3]
-            for joint in lm_list:
-                try:
-                    # Get relative position to the wrist and scale by bbox dimensions
-                    normalized_x = (joint[1] - wrist[1]) / bbox_width
-                    normalized_y = (joint[2] - wrist[2]) / bbox_height
-                    normalized_landmarks.append((normalized_x, normalized_y))
-                except (TypeError, IndexError, ZeroDivisionError) as e:
-                    print(f"Error processing joint: {joint}, error: {e}")
-        return normalized_landmarks
+        """
+        Args:
+            model_path: Weights exported by scripts/export_cnn.py (.npz, runs
+                in NumPy) or the pickled torch model (.pkl, needs torch).
+        """
+        self.model = Backends.load_cnn(model_path)
+        # One feature row, refilled on every call
+        self.features = np.empty((1, NUM_FEATURES), dtype=np.float32)
 
     def evaluate(self, landmarks, handedness, bbox):
         """
         Evaluates hand landmarks to determine a gesture using a CNN model.
         """
-        # Encode handedness: 'Left' to 0, 'Right' to 1
-        encoded_handedness = 0
-        if handedness == 'Right':
-            encoded_handedness = 1
+        extract_features(landmarks, handedness, bbox, out=self.features[0])
 
-        # Normalize landmarks
-        normalized_lms = self._normalize_landmarks(landmarks, bbox)
-        
-        # Reshape landmarks for CNN input
-        landmark_features = np.array([item for sublist in normalized_lms for item in sublist])
-        landmarks_reshaped = landmark_features.reshape(1, 1, 6, 7)
+        # Predict gesture
+        return self.model.predict(self.features)
 
-        # Convert to PyTorch tensors
-        landmarks_tensor = torch.tensor(landmarks_reshaped, dtype=torch.float32)
-        handedness_tensor = torch.tensor([[encoded_handedness]], dtype=torch.float32)
+    @property
+    def classes(self):
+        """Gesture labels (output indices for models exported without them), as evaluate returns them."""
+        return self.model.classes_
 
-        # Predict gesture
-        with torch.no_grad():
-            outputs = self.model(landmarks_tensor, handedness_tensor)
-            _, predicted = torch.max(outputs.data, 1)
-            return predicted.numpy()
+    def evaluate_proba(self, landmarks, handedness, bbox):
+        """
+        Returns:
+            The softmax of the CNN's outputs, one probability per class.
+        """
+        extract_features(landmarks, handedness, bbox, out=self.features[0])
+        return self.model.predict_proba(self.features)[0]
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class HandResult:
+    """
+    One detected hand, as returned by hand_detector.find_hands.
+
+    Attributes:
+        landmarks: (21, 2) int32 array of pixel coordinates. It is the
+            detector's buffer and gets overwritten on the next frame,
+            unless smooth() replaced it with a filtered float64 copy.
+        handedness: 'Left' or 'Right'.
+        score: MediaPipe's confidence in the handedness label.
+        bbox: (x, y, w, h) with 10% padding, as get_bbox_location returns it.
+        timestamp: Capture time of the frame (time.perf_counter()).
+    """
+    __slots__ = ("landmarks", "handedness", "score", "bbox", "timestamp")
+
+    def __init__(self, landmarks, handedness, score, bbox, timestamp):
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.score = score
+        self.bbox = bbox
+        self.timestamp = timestamp
+
+    def smooth(self, landmark_filter):
+        """
+        Replaces the landmarks with landmark_filter's output for them (e.g. a
+        TemporalFilter.OneEuroFilter) and recomputes the bbox from the
+        filtered landmarks, so the two stay consistent for extract_features.
+        """
+        self.landmarks = landmark_filter(self.landmarks, self.timestamp)
+        self.bbox = landmark_bbox(self.landmarks)
+        return self
+
+    @property
+    def lm_list(self):
+        """Landmarks in the old [[id, x, y], ...] list format."""
+        return [[id, x, y] for id, (x, y) in enumerate(self.landmarks.tolist())]
+
+    def __repr__(self):
+        return f"HandResult({self.handedness}, score={self.score:.2f}, bbox={self.bbox})"
+
+
+def landmark_bbox(landmarks, padding=0.1):
+    """
+    The bbox of a (21, 2) landmark array, padded like
+    hand_detector.get_landmarks pads it (without rounding to whole pixels).
+
+    Returns:
+        (x, y, w, h)
+    """
+    x_min, y_min = landmarks.min(axis=0).tolist()
+    x_max, y_max = landmarks.max(axis=0).tolist()
+    pad_x, pad_y = (x_max - x_min) * padding, (y_max - y_min) * padding
+    x_min, y_min = max(0.0, x_min - pad_x), max(0.0, y_min - pad_y)
+    x_max, y_max = x_max + pad_x, y_max + pad_y
+    return (x_min, y_min, x_max - x_min, y_max - y_min)
+
+
+def stack_hands(hands):
+    """
+    Stacks HandResults for a batched GestureEvaluator call.
+
+    Returns:
+        (landmarks, handedness, bboxes): (n, 21, 2) landmarks, n labels and
+        (n, 4) bboxes.
+    """
+    landmarks = np.stack([hand.landmarks for hand in hands]) if hands else np.empty((0, 21, 2))
+    bboxes = np.array([hand.bbox for hand in hands], dtype=np.float64).reshape(-1, 4)
+    return landmarks, [hand.handedness for hand in hands], bboxes
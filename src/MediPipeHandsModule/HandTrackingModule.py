@@ -2,28 +2,176 @@ import cv2
 import mediapipe as mp
 import time
 import numpy as np
-from google.protobuf.json_format import MessageToDict
+from src.MediPipeHandsModule.InferenceWorker import InferenceWorker
+from src.MediPipeHandsModule.HandResult import HandResult, stack_hands
+from src.MediPipeHandsModule.SessionRecorder import open_source
 #init camera on camera 0 (inbuilt)
 
+NUM_LANDMARKS = 21
+MIRRORED_HANDEDNESS = {'Left': 'Right', 'Right': 'Left'}
+
 class hand_detector():
-    def __init__(self, mode=False, max_hands=2, detection_con=0.5, track_con=0.5):
+    def __init__(self, mode=False, max_hands=2, detection_con=0.5, track_con=0.5, worker=False, roi_tracking=False, roi_scale=2.0):
+        """
+        Args:
+            worker: Run MediaPipe in a child process instead of on the calling
+                thread. find_hands then never blocks on inference and uses the
+                newest landmarks the worker has finished.
+            roi_tracking: Only send a window around the last known hand to
+                MediaPipe, falling back to the full frame when the hand is lost.
+            roi_scale: Size of that window relative to the hand's bbox.
+        """
         self.mode = mode
         self.max_hands = max_hands
         self.detection_con = detection_con
         self.track_con = track_con
+        self.roi_tracking = roi_tracking
+        self.roi_scale = roi_scale
+        self.roi = None
 
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(self.mode, self.max_hands, min_detection_confidence=self.detection_con, min_tracking_confidence=self.track_con)
         self.mpDraw = mp.solutions.drawing_utils
+        self.worker = None
+        self.hands = None
+        # Crops go through their own instance, see _process
+        self.roi_hands = None
+        if worker:
+            self.worker = InferenceWorker(self.mode, self.max_hands, self.detection_con, self.track_con)
+        else:
+            self.hands = self.mp_hands.Hands(self.mode, self.max_hands, min_detection_confidence=self.detection_con, min_tracking_confidence=self.track_con)
+
+        # Per-hand landmark buffers, filled in place every frame
+        self._lm_norm = np.empty((self.max_hands, NUM_LANDMARKS, 2), dtype=np.float64)
+        self._lm_px = np.empty((self.max_hands, NUM_LANDMARKS, 2), dtype=np.int32)
+        self.hand_results = []
+
+    def close(self):
+        """Releases MediaPipe (and stops the worker process, if any)."""
+        if self.worker is not None:
+            self.worker.close()
+        if self.hands is not None:
+            self.hands.close()
+            self.hands = None
+        if self.roi_hands is not None:
+            self.roi_hands.close()
+            self.roi_hands = None
+
+    def find_hands(self, img, draw=True, timestamp=None, mirror=False):
+        """
+        Runs hand detection on a BGR frame.
+
+        Args:
+            img: The frame, drawn on in place when draw is True.
+            draw: Whether to draw the landmarks and bbox on the image.
+            timestamp: Capture time of the frame, defaults to now. With a worker
+                the hands carry the capture time of the frame they were found in.
+            mirror: Treat img as an unflipped camera frame and return hands as
+                if it had been flipped with cv2.flip(img, 1): landmarks and bbox
+                are mirrored and Left/Right swapped. Saves flipping the pixels.
+                Only the landmarks are drawn in this mode, on the unflipped img.
+
+        Returns:
+            A list of HandResult, one per detected hand.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        h, w = img.shape[:2]
+        if self.worker is not None:
+            previous = self.worker.results
+            # The worker gets the whole frame, so it can fall back to it on the same frame
+            self.worker.submit(img, self.roi, timestamp)
+            self.results = self.worker.poll()
+            if self.results is not previous:
+                self._to_full_frame(self.results, self.worker.roi, w, h)
+            if self.worker.timestamp is not None:
+                # The hands are from the frame the worker finished, maybe an older one
+                timestamp = self.worker.timestamp
+        else:
+            self.results = self._process(img, self.roi)
+            if self.roi is not None and not self.results.multi_hand_landmarks:
+                # Tracking lost, search the whole frame again
+                self.results = self._process(img, None)
 
-    def find_hands(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
+        hand_results = []
         if self.results.multi_hand_landmarks:
-            for handLms in self.results.multi_hand_landmarks:
+            for hand_no, handLms in enumerate(self.results.multi_hand_landmarks):
                 if draw:
                     self.mpDraw.draw_landmarks(img, handLms, self.mp_hands.HAND_CONNECTIONS)
-        return img
+                landmarks, bbox, _ = self.get_landmarks(img, hand_no, draw and not mirror, mirror)
+                classification = self.results.multi_handedness[hand_no].classification[0]
+                label = MIRRORED_HANDEDNESS[classification.label] if mirror else classification.label
+                hand_results.append(HandResult(landmarks, label, classification.score, bbox, timestamp))
+        self.hand_results = hand_results
+        if self.roi_tracking:
+            self.roi = self._next_roi(hand_results, w, h, mirror)
+        return hand_results
+
+    def _process(self, img, roi):
+        hands = self.hands
+        if roi is not None:
+            # In video mode MediaPipe tracks from the previous image, which
+            # has to be the same kind of image: crops and full frames don't mix
+            if self.roi_hands is None:
+                self.roi_hands = self.mp_hands.Hands(self.mode, self.max_hands, min_detection_confidence=self.detection_con, min_tracking_confidence=self.track_con)
+            hands = self.roi_hands
+        imgRGB = cv2.cvtColor(self._crop(img, roi), cv2.COLOR_BGR2RGB)
+        results = hands.process(imgRGB)
+        self._to_full_frame(results, roi, img.shape[1], img.shape[0])
+        return results
+
+    @staticmethod
+    def _crop(img, roi):
+        if roi is None:
+            return img
+        x0, y0, x1, y1 = roi
+        return img[y0:y1, x0:x1]
+
+    @staticmethod
+    def _to_full_frame(results, roi, w, h):
+        """Maps landmarks found in a crop back to normalized full-frame coordinates, in place."""
+        if roi is None or not results.multi_hand_landmarks:
+            return
+        x0, y0, x1, y1 = roi
+        crop_w, crop_h = x1 - x0, y1 - y0
+        for handLms in results.multi_hand_landmarks:
+            for lm in handLms.landmark:
+                lm.x = (lm.x * crop_w + x0) / w
+                lm.y = (lm.y * crop_h + y0) / h
+
+    def _next_roi(self, hand_results, w, h, mirror=False):
+        """
+        Picks the window to search next frame, or None for the full frame.
+
+        The window is kept while the hands stay well inside it, so MediaPipe's
+        own tracking sees a stable crop instead of one that shifts every frame.
+        """
+        if not hand_results:
+            return None
+        x_min = min(hand.bbox[0] for hand in hand_results)
+        y_min = min(hand.bbox[1] for hand in hand_results)
+        x_max = max(hand.bbox[0] + hand.bbox[2] for hand in hand_results)
+        y_max = max(hand.bbox[1] + hand.bbox[3] for hand in hand_results)
+        if mirror:
+            # The window crops the unflipped frame
+            x_min, x_max = w - x_max, w - x_min
+
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            margin_x = (rx1 - rx0) // 8
+            margin_y = (ry1 - ry0) // 8
+            if (x_min - rx0 >= margin_x and rx1 - x_max >= margin_x and
+                    y_min - ry0 >= margin_y and ry1 - y_max >= margin_y):
+                return self.roi
+
+        side = int(max(x_max - x_min, y_max - y_min) * self.roi_scale)
+        side = max(side, 160)
+        if side >= w and side >= h:
+            return None
+        half = side // 2
+        cx, cy = (x_min + x_max) // 2, (y_min + y_max) // 2
+        x0 = min(max(0, cx - half), max(0, w - side))
+        y0 = min(max(0, cy - half), max(0, h - side))
+        return (x0, y0, min(w, x0 + side), min(h, y0 + side))
 
     def find_position(self, img, hand_no=0, draw=True):
         """
@@ -49,100 +197,114 @@ class hand_detector():
                 self.mpDraw.draw_landmarks(img, my_hand, self.mp_hands.HAND_CONNECTIONS)
         return lm_list
 
+    def landmark_batch(self):
+        """
+        Landmarks of every hand from the last find_hands call in one array.
+
+        Returns:
+            (n_hands, 21, 2) landmarks as the HandResults hold them. While
+            they still point into the detector's buffer this is a view of it
+            (no copy, overwritten next frame). Once a hand was smoothed
+            (HandResult.smooth) its filtered landmarks are stacked instead,
+            so the batch matches what was evaluated.
+        """
+        if all(hand.landmarks.base is self._lm_px for hand in self.hand_results):
+            return self._lm_px[:len(self.hand_results)]
+        return stack_hands(self.hand_results)[0]
+
     def get_handedness(self):
         handedness_list = []
         if self.results.multi_hand_landmarks and self.results.multi_handedness:
             for hand_handedness in self.results.multi_handedness:
-                handedness_dict = MessageToDict(hand_handedness)
-                handedness_list.append(handedness_dict['classification'][0]['label'])
+                handedness_list.append(hand_handedness.classification[0].label)
         return handedness_list
-    
-    def get_bbox_location(self, img, hand_no=0, draw=True):
 
-        lm_list = []
-        x_list = []
-        y_list = []
+    def get_landmarks(self, img, hand_no=0, draw=True, mirror=False):
+        """
+        Finds the landmarks, bounding box and midpoint of a specific hand.
 
-        bbox = None
-        mid = None
-        
-        if self.results.multi_hand_landmarks:
-            for hand_index, my_hand in enumerate(self.results.multi_hand_landmarks):
-                if hand_index == hand_no:
-                    for id, lm in enumerate(my_hand.landmark):
-                        h,w,c = img.shape
-                        cx, cy = int(lm.x*w), int(lm.y*h)
-
-                        x_list.append(cx)
-                        y_list.append(cy)
-                        lm_list.append([id, cx, cy])
-
-                #calculate bbox
-                    x_min, x_max = min(x_list), max(x_list)
-                    y_min, y_max = min(y_list), max(y_list)
-
-                #add padding
-                    width = x_max - x_min
-                    height = y_max - y_min
-                    buffer_x = int(width * 0.1)  # 10% padding
-                    buffer_y = int(height * 0.1) # 10% padding
-                    x_min = max(0, x_min - buffer_x)
-                    y_min = max(0, y_min - buffer_y)
-                    x_max = x_max + buffer_x
-                    y_max = y_max + buffer_y
-                   
-                    x_min_coord = min(x_list)
-                    x_max_coord = max(x_list)
-                    y_min_coord = min(y_list)
-                    y_max_coord = max(y_list)
-
-                    lm_min_x = next(lm for lm in lm_list if lm[1] == x_min_coord)
-                    lm_max_x = next(lm for lm in lm_list if lm[1] == x_max_coord)
-
-                    lm_min_y = next(lm for lm in lm_list if lm[2] == y_min_coord)
-                    lm_max_y = next(lm for lm in lm_list if lm[2] == y_max_coord)
-                    
-                    idd, minxx, minxy = lm_min_x
-                    idd, minyx, minyy = lm_min_y
-                    idd, maxxx, maxxy = lm_max_x
-                    idd, maxyx, maxyy = lm_max_y
-                    
-
-                    mid = [(x_max - x_min)/2,(y_max - y_min)/2]
-
-
-
-
-
-                    bbox = (x_min, y_min, x_max - x_min, y_max - y_min)
-                    if draw:
-                        cv2.rectangle(img, (x_min, y_min), (x_max, y_max), (255, 0, 0), 2)
-                        cv2.line(img, (minxx, minxy), (maxxx, maxxy), (255,0,255), 2)
-                        cv2.line(img, (minyx, minyy), (maxyx, maxyy), (255,0,255), 2)
-
-                    return lm_list, bbox, mid
+        Args:
+            img: The image the landmarks were found in.
+            hand_no: The index of the hand.
+            draw: Whether to draw the bbox and extreme-landmark lines on the image.
+            mirror: Return coordinates for the horizontally flipped image.
+
+        Returns:
+            (landmarks, bbox, mid) where landmarks is a (21, 2) int32 array of
+            pixel coordinates, or (None, None, None) if there is no such hand.
+            The array is reused on the next call, copy it to keep it.
+        """
+        if not self.results.multi_hand_landmarks or hand_no >= len(self.results.multi_hand_landmarks):
+            return None, None, None
+
+        h, w = img.shape[:2]
+        norm = self._lm_norm[hand_no]
+        landmarks = self._lm_px[hand_no]
+        for id, lm in enumerate(self.results.multi_hand_landmarks[hand_no].landmark):
+            norm[id, 0] = lm.x
+            norm[id, 1] = lm.y
+        if mirror:
+            np.subtract(1.0, norm[:, 0], out=norm[:, 0])
+        # Truncates like int(lm.x * w) did
+        np.multiply(norm, (w, h), out=landmarks, casting='unsafe')
+
+        xs = landmarks[:, 0]
+        ys = landmarks[:, 1]
+        i_min_x, i_max_x = xs.argmin(), xs.argmax()
+        i_min_y, i_max_y = ys.argmin(), ys.argmax()
+        x_min, x_max = int(xs[i_min_x]), int(xs[i_max_x])
+        y_min, y_max = int(ys[i_min_y]), int(ys[i_max_y])
+
+        #add padding
+        buffer_x = int((x_max - x_min) * 0.1)  # 10% padding
+        buffer_y = int((y_max - y_min) * 0.1)  # 10% padding
+        x_min = max(0, x_min - buffer_x)
+        y_min = max(0, y_min - buffer_y)
+        x_max = x_max + buffer_x
+        y_max = y_max + buffer_y
+
+        mid = [(x_max - x_min)/2, (y_max - y_min)/2]
+        bbox = (x_min, y_min, x_max - x_min, y_max - y_min)
+
+        if draw:
+            cv2.rectangle(img, (x_min, y_min), (x_max, y_max), (255, 0, 0), 2)
+            cv2.line(img, tuple(landmarks[i_min_x].tolist()), tuple(landmarks[i_max_x].tolist()), (255,0,255), 2)
+            cv2.line(img, tuple(landmarks[i_min_y].tolist()), tuple(landmarks[i_max_y].tolist()), (255,0,255), 2)
+
+        return landmarks, bbox, mid
+
+    def get_bbox_location(self, img, hand_no=0, draw=True):
+        """
+        List-based wrapper around get_landmarks, kept for existing callers.
+
+        Returns:
+            (lm_list, bbox, mid) with lm_list as [[id, x, y], ...].
+        """
+        landmarks, bbox, mid = self.get_landmarks(img, hand_no, draw)
+        if landmarks is None:
+            return [], None, None
+        lm_list = [[id, x, y] for id, (x, y) in enumerate(landmarks.tolist())]
         return lm_list, bbox, mid
 
 
-def main():
-    cap = cv2.VideoCapture(0)
+def main(source=0):
+    cap = open_source(source)
     pTime = 0
     cTime = 0
     detector = hand_detector()
     while True:
         success, img = cap.read()
-        img = detector.find_hands(img)
-        handedness = detector.get_handedness()
+        if not success:
+            break
+        hands = detector.find_hands(img)
 
-        if handedness:
-            for i, hand in enumerate(handedness):
-                lm_list = detector.find_position(img, hand_no=i)
-                if len(lm_list) != 0:
-                    print(f'{hand} Hand Landmarks:')
-                    print(lm_list[4])
+        for hand in hands:
+            print(f'{hand.handedness} Hand Landmarks:')
+            print(hand.landmarks[4])
 
         cv2.imshow("Image", img)
         cv2.waitKey(1)
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(sys.argv[1] if len(sys.argv) > 1 else 0)
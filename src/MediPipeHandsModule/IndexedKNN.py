@@ -0,0 +1,156 @@
+import numpy as np
+
+INDEXES = ('brute', 'kd_tree', 'ball_tree')
+
+# Up to this many samples fit() picks a brute force scan: one float32 matrix
+# multiply beats walking a tree at this size and needs no copy of the samples
+BRUTE_FORCE_ROWS = 4096
+
+
+class IndexedKNN:
+    """
+    k-nearest-neighbour gesture classifier over a float32 sample matrix.
+
+    Small sample sets are searched brute force, as one float32 matrix
+    multiply straight on the sample matrix, which stays memory-mapped when
+    loaded from an artifact. Larger ones can be projected with PCA to a few
+    dimensions first, where a KD-tree prunes well. The tree is built once
+    when the model is loaded, so a query costs roughly log(samples) instead
+    of a scan over all of them. sklearn's trees keep their own float64 copy
+    of the samples, so a tree costs memory on top of the float32 matrix.
+    Votes are uniform like sklearn's KNeighborsClassifier default.
+    """
+
+    ARTIFACT_KIND = 'knn'
+
+    def __init__(self, samples, labels, classes, n_neighbors=5, mean=None, components=None, index='kd_tree'):
+        """
+        Args:
+            samples: (n, d) training vectors, already projected if components is set.
+            labels: (n,) index into classes for every sample.
+            classes: The gesture labels.
+            n_neighbors: How many neighbours vote.
+            mean, components: The PCA projection (d_in,) and (d, d_in), or None.
+            index: 'brute', 'kd_tree' or 'ball_tree'.
+        """
+        if index not in INDEXES:
+            raise ValueError(f"Unknown index '{index}', choose from {', '.join(INDEXES)}")
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.labels = np.asarray(labels).astype(np.intp, copy=False)
+        self.classes_ = np.asarray(classes)
+        self.n_neighbors = int(min(n_neighbors, len(self.samples)))
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self.components = None if components is None else np.ascontiguousarray(components, dtype=np.float32)
+        self.index = str(index)
+
+        if self.index == 'brute':
+            self.tree = None
+            self.sq_norms = np.einsum('ij,ij->i', self.samples, self.samples)
+        else:
+            from sklearn.neighbors import BallTree, KDTree
+            tree = KDTree if self.index == 'kd_tree' else BallTree
+            self.tree = tree(self.samples)
+
+    @classmethod
+    def fit(cls, X, y, n_neighbors=5, n_components=None, index=None):
+        """
+        Args:
+            X: (n, 43) features (Features.py).
+            y: (n,) gesture labels.
+            n_components: Project to this many PCA dimensions, None keeps all.
+            index: 'brute', 'kd_tree' or 'ball_tree', defaults to brute force
+                for up to BRUTE_FORCE_ROWS samples, else a KD-tree for up to 16
+                dimensions and a ball tree above that.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        classes, labels = np.unique(y, return_inverse=True)
+        mean = components = None
+        if n_components is not None:
+            mean = X.mean(axis=0)
+            # Right singular vectors of the centered data are the principal axes
+            _, _, vt = np.linalg.svd(X - mean, full_matrices=False)
+            components = vt[:n_components]
+            X = (X - mean) @ components.T
+        if index is None and len(X) <= BRUTE_FORCE_ROWS:
+            index = 'brute'
+        elif index is None:
+            index = 'kd_tree' if X.shape[1] <= 16 else 'ball_tree'
+        return cls(X, labels, classes, n_neighbors, mean, components, index)
+
+    @classmethod
+    def from_sklearn(cls, knn, n_components=None, index=None):
+        """Rebuilds a fitted KNeighborsClassifier from its stored training samples."""
+        return cls.fit(knn._fit_X, knn.classes_[knn._y], knn.n_neighbors, n_components, index)
+
+    def extend(self, X, y):
+        """
+        Returns a model with the samples X, y added, projected with the
+        existing PCA. Every label in y must already be one of classes_.
+        """
+        labels = np.searchsorted(self.classes_, y)
+        if not np.array_equal(self.classes_.take(labels, mode='clip'), np.asarray(y)):
+            raise ValueError('New samples have labels the model does not know, fit it again instead')
+        return IndexedKNN(
+            np.concatenate([self.samples, self.transform(X)]),
+            np.concatenate([self.labels, labels]),
+            self.classes_, self.n_neighbors, self.mean, self.components, self.index,
+        )
+
+    def artifact_arrays(self):
+        """The arrays and scalar parameters that describe the model (see ModelArtifact)."""
+        arrays = dict(samples=self.samples, labels=self.labels)
+        if self.components is not None:
+            arrays.update(mean=self.mean, components=self.components)
+        return arrays, {'n_neighbors': self.n_neighbors, 'index': self.index}
+
+    @classmethod
+    def from_artifact(cls, arrays, params, classes):
+        return cls(
+            samples=arrays['samples'],
+            labels=arrays['labels'],
+            classes=classes,
+            n_neighbors=params['n_neighbors'],
+            mean=arrays['mean'] if 'mean' in arrays else None,
+            components=arrays['components'] if 'components' in arrays else None,
+            index=params['index'],
+        )
+
+    def save(self, path):
+        arrays, params = self.artifact_arrays()
+        np.savez(path, classes=self.classes_, **arrays, **params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            params = {'n_neighbors': int(data['n_neighbors']), 'index': str(data['index'])}
+            return cls.from_artifact(data, params, data['classes'])
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.components is None:
+            return X
+        return (X - self.mean) @ self.components.T
+
+    def neighbours(self, X):
+        """(n, n_neighbors) sample indices of the nearest neighbours of every row, in no particular order."""
+        X = self.transform(X)
+        if self.tree is not None:
+            return self.tree.query(X, k=self.n_neighbors)[1]
+        # |x - s|^2 without the |x|^2 term, which is the same for every sample
+        distances = X @ self.samples.T
+        distances *= -2
+        distances += self.sq_norms
+        return np.argpartition(distances, self.n_neighbors - 1, axis=1)[:, :self.n_neighbors]
+
+    def predict_proba(self, X):
+        neighbours = self.neighbours(X)
+        votes = self.labels[neighbours]
+        proba = np.zeros((len(votes), len(self.classes_)))
+        np.add.at(proba, (np.arange(len(votes))[:, np.newaxis], votes), 1.0)
+        proba /= self.n_neighbors
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
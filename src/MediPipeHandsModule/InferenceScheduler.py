@@ -0,0 +1,91 @@
+import collections
+import math
+import time
+
+
+class InferenceScheduler:
+    """
+    Decides on which rendered frames hand detection should run.
+
+    Detection runs every frame while it fits in what is left of the frame
+    budget. When it does not, it runs every Nth frame (N picked from the
+    measured costs) and the game keeps acting on the last gesture in between,
+    but never less often than the game's minimum perception rate.
+    """
+
+    def __init__(self, target_fps=60, min_rate=10, smoothing=0.1):
+        """
+        Args:
+            target_fps: The rate the game loop is paced at (clock.tick value).
+            min_rate: Detections per second the game needs to stay playable.
+            smoothing: Weight of the newest sample in the cost averages.
+        """
+        self.frame_budget = 1.0 / target_fps
+        self.min_interval = 1.0 / min_rate
+        self.smoothing = smoothing
+
+        self.detect_cost = 0.0  # seconds, moving average
+        self.other_cost = 0.0   # rest of the frame's work, moving average
+        self.stride = 1
+        self.frames_since = 0
+        self.last_detection = None
+        self._detected_last_frame = False
+        self._last_cost = 0.0
+        self._detections = collections.deque(maxlen=64)
+
+    def _average(self, current, sample):
+        return current + self.smoothing * (sample - current)
+
+    def should_detect(self, frame_time=None):
+        """
+        Call once per rendered frame.
+
+        Args:
+            frame_time: Seconds the previous frame spent working, without the
+                tick delay (clock.get_rawtime() / 1000). It may include the
+                previous detection, which is subtracted here.
+
+        Returns:
+            True if detection should run this frame.
+        """
+        now = time.perf_counter()
+        if frame_time is not None:
+            other = frame_time - (self._last_cost if self._detected_last_frame else 0.0)
+            self.other_cost = self._average(self.other_cost, max(0.0, other))
+        self.frames_since += 1
+        self._detected_last_frame = False
+
+        slack = self.frame_budget - self.other_cost
+        if slack >= self.detect_cost:
+            self.stride = 1
+        elif slack > 0:
+            self.stride = math.ceil(self.detect_cost / slack)
+        else:
+            self.stride = math.inf
+
+        if self.last_detection is None or now - self.last_detection >= self.min_interval:
+            return True
+        return self.frames_since >= self.stride
+
+    def record(self, cost):
+        """Call after a detection ran, with how long it took in seconds."""
+        now = time.perf_counter()
+        self.detect_cost = cost if self.last_detection is None else self._average(self.detect_cost, cost)
+        self.last_detection = now
+        self.frames_since = 0
+        self._last_cost = cost
+        self._detected_last_frame = True
+        self._detections.append(now)
+
+    @property
+    def detection_rate(self):
+        """Detections per second over the recent window."""
+        if len(self._detections) < 2:
+            return 0.0
+        span = self._detections[-1] - self._detections[0]
+        if span <= 0:
+            return 0.0
+        return (len(self._detections) - 1) / span
+
+    def report(self):
+        return f"detection {self.detection_rate:.1f}/s, cost {self.detect_cost * 1000:.1f} ms, every {self.stride} frame(s)"
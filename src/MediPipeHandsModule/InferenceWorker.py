@@ -0,0 +1,209 @@
+import atexit
+import multiprocessing
+import queue
+import types
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+
+def _worker_main(shm_name, requests, responses, mode, max_hands, detection_con, track_con):
+    """Child process loop: read RGB frames from shared memory, send back serialized landmarks."""
+    import mediapipe as mp
+
+    def make_hands():
+        return mp.solutions.hands.Hands(mode, max_hands, min_detection_confidence=detection_con, min_tracking_confidence=track_con)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    hands = make_hands()
+    # Crops get their own instance, in video mode MediaPipe tracks the hand
+    # from the previous image and a crop and the full frame don't line up
+    roi_hands = None
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            seq, shape, roi, timestamp = request
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            results = None
+            if roi is not None:
+                if roi_hands is None:
+                    roi_hands = make_hands()
+                x0, y0, x1, y1 = roi
+                results = roi_hands.process(np.ascontiguousarray(frame[y0:y1, x0:x1]))
+                if not results.multi_hand_landmarks:
+                    # Tracking lost, search the whole frame again
+                    results, roi = None, None
+            if results is None:
+                results = hands.process(frame)
+            # Drop the view before the next request so shm.close() never sees an exported buffer
+            del frame
+            landmarks = [lms.SerializeToString() for lms in results.multi_hand_landmarks or []]
+            handedness = [hand.SerializeToString() for hand in results.multi_handedness or []]
+            responses.put((seq, landmarks, handedness, roi, timestamp))
+    finally:
+        hands.close()
+        if roi_hands is not None:
+            roi_hands.close()
+        shm.close()
+
+
+def empty_results():
+    return types.SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+
+# Restarts of a dead worker before giving up on it
+MAX_RESTARTS = 3
+
+
+class InferenceWorker:
+    """
+    Runs MediaPipe Hands in a child process.
+
+    Frames are converted to RGB straight into a shared memory buffer, so the
+    only thing that crosses the process boundary per frame is a (seq, shape)
+    request and the serialized landmark protobufs coming back. This keeps
+    inference off the game's core and out of its GIL.
+    """
+
+    def __init__(self, mode=False, max_hands=2, detection_con=0.5, track_con=0.5, capacity=1280 * 720 * 3):
+        self.args = (mode, max_hands, detection_con, track_con)
+        self.ctx = multiprocessing.get_context("spawn")
+        self.process = None
+        self.shm = None
+        self.closed = False
+        self.restarts = 0
+        self.results = empty_results()
+        # The window the newest results were found in, None for the full frame,
+        # and the capture time of their frame
+        self.roi = None
+        self.timestamp = None
+        self._start(capacity)
+        atexit.register(self.close)
+
+    def _start(self, capacity):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True, size=capacity)
+        self.requests = self.ctx.Queue()
+        self.responses = self.ctx.Queue()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(self.shm.name, self.requests, self.responses) + self.args,
+            name="InferenceWorker",
+            daemon=True,
+        )
+        self.process.start()
+        self.seq = 0
+        self.pending = None
+
+    def _stop(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                self.requests.put(None)
+                self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=1.0)
+            self.process = None
+            # Don't let the feeder threads block interpreter shutdown
+            self.requests.cancel_join_thread()
+            self.responses.cancel_join_thread()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def _check_alive(self):
+        """Restarts a worker process that died, its pending frame would never be answered."""
+        if self.process is not None and self.process.is_alive():
+            return
+        exitcode = self.process.exitcode if self.process is not None else None
+        if self.restarts >= MAX_RESTARTS:
+            raise RuntimeError(f"InferenceWorker died {self.restarts + 1} times (exit code {exitcode}), giving up")
+        self.restarts += 1
+        print(f"InferenceWorker died (exit code {exitcode}), restarting")
+        self._stop()
+        self._start(self.capacity)
+        self.results = empty_results()
+        self.roi = None
+        self.timestamp = None
+
+    def submit(self, img, roi=None, timestamp=None):
+        """
+        Hands a BGR frame to the worker if it is idle.
+
+        Args:
+            roi: (x0, y0, x1, y1) window to search, the worker falls back to
+                the full frame if it finds no hand in it.
+            timestamp: Capture time of img, handed back with its results
+                (self.timestamp) since they arrive a frame or more later.
+
+        Returns:
+            True if the frame was sent, False if the worker is still busy with
+            the previous one (the frame is then skipped, not queued).
+
+        Raises:
+            RuntimeError: If the worker process keeps dying.
+        """
+        if self.pending is not None:
+            self._check_alive()
+            if self.pending is not None:
+                return False
+        if img.nbytes > self.capacity:
+            # A bigger camera than expected, restart with a buffer that fits
+            self._stop()
+            self._start(img.nbytes)
+
+        shared = np.ndarray(img.shape, dtype=np.uint8, buffer=self.shm.buf)
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=shared)
+        del shared
+
+        self.seq += 1
+        self.pending = self.seq
+        self.requests.put((self.seq, img.shape, roi, timestamp))
+        return True
+
+    def poll(self, timeout=None):
+        """
+        Collects the worker's answer to the pending frame, if there is one.
+
+        Args:
+            timeout: None to return immediately, otherwise seconds to wait.
+
+        Returns:
+            The newest results object (same shape as Hands.process output).
+            Until a new answer arrives the previous results are returned,
+            after a worker restart no hands. Landmarks are relative to the
+            window in self.roi, self.timestamp is their frame's capture time.
+
+        Raises:
+            RuntimeError: If the worker process keeps dying.
+        """
+        if self.pending is None:
+            return self.results
+        try:
+            if timeout is None:
+                seq, landmarks, handedness, roi, timestamp = self.responses.get_nowait()
+            else:
+                seq, landmarks, handedness, roi, timestamp = self.responses.get(timeout=timeout)
+        except queue.Empty:
+            self._check_alive()
+            return self.results
+
+        self.pending = None
+        self.roi = roi
+        self.timestamp = timestamp
+        self.results = types.SimpleNamespace(
+            multi_hand_landmarks=[landmark_pb2.NormalizedLandmarkList.FromString(b) for b in landmarks] or None,
+            multi_handedness=[classification_pb2.ClassificationList.FromString(b) for b in handedness] or None,
+        )
+        return self.results
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._stop()
@@ -0,0 +1,108 @@
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.MediPipeHandsModule.CompiledForest import CompiledForest
+from src.MediPipeHandsModule.Features import FEATURE_NAMES, HANDEDNESS_CODES
+from src.MediPipeHandsModule.IndexedKNN import IndexedKNN
+from src.MediPipeHandsModule.NumpyCNN import NumpyCNN
+
+ARTIFACT_VERSION = 1
+
+# Artifact kind -> model class with artifact_arrays() / from_artifact()
+MODEL_TYPES = {cls.ARTIFACT_KIND: cls for cls in (CompiledForest, IndexedKNN, NumpyCNN)}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_artifact(path):
+    return os.path.isfile(os.path.join(path, 'header.json'))
+
+
+def save_artifact(path, model, training_data=None, benchmark=None, feature_names=FEATURE_NAMES):
+    """
+    Writes a model as an artifact directory:
+        header.json   format version, model kind and parameters, feature
+                      schema, label map, handedness encoding, training data
+                      hash and benchmark numbers
+        <name>.npy    one raw array per model array, loadable memory-mapped
+
+    Args:
+        model: A CompiledForest, IndexedKNN or NumpyCNN.
+        training_data: Path of the CSV the model was trained on, hashed so a
+            stale model can be spotted.
+        benchmark: Optional dict of numbers to keep with the model, e.g.
+            {'accuracy': ..., 'latency_ms': ...}.
+        feature_names: Names of the input features in order.
+    """
+    kind = getattr(model, 'ARTIFACT_KIND', None)
+    if kind not in MODEL_TYPES:
+        raise ValueError(f'Cannot save {type(model).__name__} as an artifact, supported: '
+                         f'{", ".join(cls.__name__ for cls in MODEL_TYPES.values())}')
+    arrays, params = model.artifact_arrays()
+
+    os.makedirs(path, exist_ok=True)
+    array_info = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        np.save(os.path.join(path, f'{name}.npy'), array, allow_pickle=False)
+        array_info[name] = {'file': f'{name}.npy', 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+    training = None
+    if training_data is not None:
+        training = {'path': os.path.basename(training_data), 'sha256': file_sha256(training_data)}
+
+    header = {
+        'version': ARTIFACT_VERSION,
+        'kind': kind,
+        'params': params,
+        'arrays': array_info,
+        'classes': np.asarray(model.classes_).tolist(),
+        'features': list(feature_names),
+        'handedness': HANDEDNESS_CODES,
+        'training_data': training,
+        'benchmark': benchmark,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(os.path.join(path, 'header.json'), 'w') as f:
+        json.dump(header, f, indent=4)
+
+
+def read_header(path):
+    with open(os.path.join(path, 'header.json'), 'r') as f:
+        header = json.load(f)
+    if header.get('version') != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {header.get('version')} in {path}")
+    if header.get('handedness') != HANDEDNESS_CODES:
+        raise ValueError(f"{path} was trained with handedness encoding {header.get('handedness')}, "
+                         f"this version uses {HANDEDNESS_CODES}")
+    return header
+
+
+def load_artifact(path, mmap=True):
+    """
+    Loads an artifact directory written by save_artifact.
+
+    Arrays are memory-mapped read-only by default: nothing is read until the
+    model touches it, and processes that load the same artifact share the
+    pages through the OS file cache.
+
+    Returns:
+        The model, with the parsed header as model.header.
+    """
+    header = read_header(path)
+    mmap_mode = 'r' if mmap else None
+    arrays = {name: np.load(os.path.join(path, info['file']), mmap_mode=mmap_mode, allow_pickle=False)
+              for name, info in header['arrays'].items()}
+    model = MODEL_TYPES[header['kind']].from_artifact(arrays, header['params'], header['classes'])
+    model.header = header
+    return model
@@ -0,0 +1,142 @@
+import numpy as np
+
+# Weights of CNNModel.CNN, named like its state_dict with '.' -> '_'
+WEIGHTS = ('conv1_weight', 'conv1_bias', 'conv2_weight', 'conv2_bias',
+           'fc1_weight', 'fc1_bias', 'fc2_weight', 'fc2_bias')
+
+
+def _patch_index(size, out_h, out_w, row_stride):
+    # Flat index of every 3x3 window (row major) in a padded image with
+    # row_stride columns, one row per output position
+    rows = np.arange(out_h)[:, None, None, None] + np.arange(size)[None, None, :, None]
+    cols = np.arange(out_w)[None, :, None, None] + np.arange(size)[None, None, None, :]
+    return (rows * row_stride + cols).reshape(out_h * out_w, size * size)
+
+
+class NumpyCNN:
+    """
+    Forward pass of CNNModel.CNN in NumPy, without importing torch.
+
+    Both convolutions run as one matrix multiply over precomputed patch
+    indices (im2col) and every intermediate array is allocated once for the
+    largest batch seen and sliced for smaller ones, so a frame costs a
+    handful of small NumPy calls.
+    Weights come from scripts/export_cnn.py. Outputs match the torch model
+    up to float32 rounding.
+    """
+
+    ARTIFACT_KIND = 'cnn'
+
+    def __init__(self, weights, classes):
+        """
+        Args:
+            weights: Arrays named as in WEIGHTS.
+            classes: Gesture label per output.
+        """
+        self.weights = w = {name: np.asarray(weights[name], dtype=np.float32) for name in WEIGHTS}
+        # (out, in, kh, kw) -> (out, kh * kw * in) matching the patch layout
+        self.conv1_w = np.ascontiguousarray(w['conv1_weight'].transpose(0, 2, 3, 1).reshape(16, -1).T)
+        self.conv1_b = w['conv1_bias']
+        self.conv2_w = np.ascontiguousarray(w['conv2_weight'].transpose(0, 2, 3, 1).reshape(32, -1).T)
+        self.conv2_b = w['conv2_bias']
+        self.fc1_w = np.ascontiguousarray(w['fc1_weight'].T)
+        self.fc1_b = w['fc1_bias']
+        self.fc2_w = np.ascontiguousarray(w['fc2_weight'].T)
+        self.fc2_b = w['fc2_bias']
+        self.classes_ = np.asarray(classes)
+        if len(self.classes_) != self.fc2_b.size:
+            raise ValueError(f'{len(self.classes_)} classes for a CNN with {self.fc2_b.size} outputs')
+
+        # 6x7 input padded to 8x9, 3x3 after the first pool padded to 5x5
+        self.index1 = _patch_index(3, 6, 7, 9)
+        self.index2 = _patch_index(3, 3, 3, 5)
+        self.buffers = {}
+        self.capacity = 0
+
+    @classmethod
+    def from_torch(cls, model, classes):
+        return cls({name.replace('.', '_'): value.detach().cpu().numpy()
+                    for name, value in model.state_dict().items()}, classes)
+
+    def artifact_arrays(self):
+        """The arrays and scalar parameters that describe the model (see ModelArtifact)."""
+        return dict(self.weights), {}
+
+    @classmethod
+    def from_artifact(cls, arrays, params, classes):
+        return cls(arrays, classes)
+
+    def save(self, path):
+        np.savez(path, classes=self.classes_, **self.weights)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_artifact(data, {}, data['classes'])
+
+    def _buffers(self, n):
+        # One set for the largest batch so far, a smaller batch uses the first n rows
+        if n > self.capacity:
+            self.capacity = n
+            self.buffers = {
+                'pad1': np.zeros((n, 8 * 9), dtype=np.float32),
+                'cols1': np.empty((n, 42, 9), dtype=np.float32),
+                'conv1': np.empty((n, 42, 16), dtype=np.float32),
+                'pad2': np.zeros((n, 5, 5, 16), dtype=np.float32),
+                'cols2': np.empty((n, 9, 9, 16), dtype=np.float32),
+                'conv2': np.empty((n, 9, 32), dtype=np.float32),
+                'fc1_in': np.empty((n, 33), dtype=np.float32),
+                'fc1': np.empty((n, 64), dtype=np.float32),
+                'fc2': np.empty((n, self.fc2_b.size), dtype=np.float32),
+            }
+        return {name: buffer[:n] for name, buffer in self.buffers.items()}
+
+    def forward(self, X):
+        """
+        Args:
+            X: (n, 43) features (Features.py): handedness then the 6x7 landmark grid.
+
+        Returns:
+            (n, classes) logits, overwritten by the next call.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n = len(X)
+        b = self._buffers(n)
+
+        # conv1 -> relu -> maxpool 2 (6x7 -> 3x3, the last column is dropped like torch does)
+        pad1 = b['pad1'].reshape(n, 8, 9)
+        pad1[:, 1:7, 1:8] = X[:, 1:].reshape(n, 6, 7)
+        np.take(b['pad1'], self.index1, axis=1, out=b['cols1'], mode='clip')
+        np.matmul(b['cols1'], self.conv1_w, out=b['conv1'])
+        b['conv1'] += self.conv1_b
+        np.maximum(b['conv1'], 0, out=b['conv1'])
+        conv1 = b['conv1'].reshape(n, 6, 7, 16)[:, :, :6]
+        pool1 = conv1.reshape(n, 3, 2, 3, 2, 16).max(axis=(2, 4))
+
+        # conv2 -> relu -> maxpool 2 (3x3 -> 1x1)
+        b['pad2'][:, 1:4, 1:4] = pool1
+        np.take(b['pad2'].reshape(n, 25, 16), self.index2, axis=1, out=b['cols2'], mode='clip')
+        np.matmul(b['cols2'].reshape(n, 9, 9 * 16), self.conv2_w, out=b['conv2'])
+        b['conv2'] += self.conv2_b
+        np.maximum(b['conv2'], 0, out=b['conv2'])
+        b['conv2'].reshape(n, 3, 3, 32)[:, :2, :2].max(axis=(1, 2), out=b['fc1_in'][:, :32])
+
+        # Append handedness, then the two linear layers
+        b['fc1_in'][:, 32] = X[:, 0]
+        np.matmul(b['fc1_in'], self.fc1_w, out=b['fc1'])
+        b['fc1'] += self.fc1_b
+        np.maximum(b['fc1'], 0, out=b['fc1'])
+        np.matmul(b['fc1'], self.fc2_w, out=b['fc2'])
+        b['fc2'] += self.fc2_b
+        return b['fc2']
+
+    def predict_proba(self, X):
+        logits = self.forward(X)
+        proba = np.exp(logits - logits.max(axis=1, keepdims=True))
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.forward(X), axis=1))
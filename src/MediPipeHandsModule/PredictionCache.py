@@ -0,0 +1,114 @@
+import collections
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Puts a bounded LRU in front of a model's predict.
+
+    Feature vectors are snapped to a grid of `step` (the features are
+    fractions of the hand's bbox, so 0.02 is 2% of the hand) and the grid
+    cell is the key. While a pose is held the landmarks barely move, the
+    cell stays the same and the model does not run at all. Vectors that
+    share a cell share the prediction made for the first one.
+    """
+
+    def __init__(self, model, step=0.02, capacity=256):
+        """
+        Args:
+            model: Anything with predict(X), e.g. CompiledForest.
+            step: Grid size the features are quantized to.
+            capacity: How many cells to remember.
+        """
+        self.model = model
+        self.step = step
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    def key(self, row):
+        return np.rint(row / self.step).astype(np.int32).tobytes()
+
+    def clear(self):
+        self.entries.clear()
+
+    def _store(self, key, result):
+        self.entries[key] = result
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, method, row):
+        key = (method, self.key(row))
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = getattr(self.model, method)(row.reshape(1, -1))
+        self._store(key, result)
+        return result
+
+    def _call(self, method, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) == 1:
+            return self._lookup(method, X[0])
+
+        # Hits are looked up first, the misses then go to the model in one call.
+        # Rows of a batch sharing a cell share the first one's prediction.
+        keys = [(method, self.key(row)) for row in X]
+        results = [None] * len(X)
+        first = {}
+        for i, key in enumerate(keys):
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                results[i] = result
+            elif key in first:
+                self.hits += 1
+            else:
+                self.misses += 1
+                first[key] = i
+        if first:
+            misses = list(first.values())
+            predicted = getattr(self.model, method)(X[misses])
+            for j, i in enumerate(misses):
+                results[i] = predicted[j:j + 1]
+                self._store(keys[i], results[i])
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                results[i] = results[first[key]]
+        return np.concatenate(results)
+
+    def predict(self, X):
+        """
+        Returns:
+            Predictions like model.predict(X). For a single row this is the
+            cached array itself, don't modify it.
+        """
+        return self._call('predict', X)
+
+    def predict_proba(self, X):
+        """Like predict, for model.predict_proba(X)."""
+        return self._call('predict_proba', X)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return (f"cache {self.hits} hits, {self.misses} misses, {self.evictions} evictions "
+                f"({self.hit_rate * 100:.0f}% hit rate, {len(self.entries)}/{self.capacity} entries)")
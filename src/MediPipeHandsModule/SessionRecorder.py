@@ -0,0 +1,208 @@
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from src.MediPipeHandsModule.Features import encode_handedness
+
+SESSION_VERSION = 1
+
+
+class SessionRecorder:
+    """
+    Records raw camera frames, their timestamps and the detected landmarks.
+
+    A session is a directory:
+        session.json     frame shape, count and format version
+        frames.raw       uint8 frames back to back, written through a memory map
+        timestamps.npy   (n,) float64 seconds since the first frame
+        landmarks.npy    (n, max_hands, 21, 2) float32 pixel coords, NaN when no hand
+        handedness.npy   (n, max_hands) int8, 0=Left 1=Right -1=no hand
+    """
+
+    def __init__(self, path, max_hands=1, chunk=256):
+        self.path = path
+        self.max_hands = max_hands
+        self.chunk = chunk
+        os.makedirs(path, exist_ok=True)
+        self.frames = None
+        self.shape = None
+        self.count = 0
+        self.capacity = 0
+        self.t0 = None
+        self.timestamps = []
+        self.landmarks = []
+        self.handedness = []
+
+    def _grow(self):
+        # Extend the file, then map the bigger file again
+        if self.frames is not None:
+            self.frames.flush()
+            del self.frames
+        self.capacity += self.chunk
+        frame_bytes = int(np.prod(self.shape))
+        with open(os.path.join(self.path, 'frames.raw'), 'ab') as f:
+            f.truncate(self.capacity * frame_bytes)
+        self.frames = np.memmap(os.path.join(self.path, 'frames.raw'), dtype=np.uint8, mode='r+',
+                                shape=(self.capacity,) + self.shape)
+
+    def write(self, img, timestamp=None, hands=()):
+        """
+        Args:
+            img: The raw BGR frame, as the camera delivered it.
+            timestamp: Capture time in seconds, defaults to now.
+            hands: HandResults detected on this frame, if any.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.shape is None:
+            self.shape = img.shape
+            self.t0 = timestamp
+            open(os.path.join(self.path, 'frames.raw'), 'wb').close()
+        if self.count == self.capacity:
+            self._grow()
+
+        self.frames[self.count] = img
+        self.count += 1
+        self.timestamps.append(timestamp - self.t0)
+
+        landmarks = np.full((self.max_hands, 21, 2), np.nan, dtype=np.float32)
+        handedness = np.full(self.max_hands, -1, dtype=np.int8)
+        for i, hand in enumerate(hands[:self.max_hands]):
+            landmarks[i] = hand.landmarks
+            handedness[i] = encode_handedness(hand.handedness)
+        self.landmarks.append(landmarks)
+        self.handedness.append(handedness)
+
+    def close(self):
+        if self.frames is not None:
+            self.frames.flush()
+            del self.frames
+            self.frames = None
+            # Drop the unused tail of the last chunk
+            with open(os.path.join(self.path, 'frames.raw'), 'ab') as f:
+                f.truncate(self.count * int(np.prod(self.shape)))
+
+        np.save(os.path.join(self.path, 'timestamps.npy'), np.array(self.timestamps, dtype=np.float64))
+        np.save(os.path.join(self.path, 'landmarks.npy'),
+                np.array(self.landmarks, dtype=np.float32).reshape(-1, self.max_hands, 21, 2))
+        np.save(os.path.join(self.path, 'handedness.npy'),
+                np.array(self.handedness, dtype=np.int8).reshape(-1, self.max_hands))
+        with open(os.path.join(self.path, 'session.json'), 'w') as f:
+            json.dump({
+                'version': SESSION_VERSION,
+                'frames': self.count,
+                'shape': list(self.shape) if self.shape else None,
+                'dtype': 'uint8',
+                'max_hands': self.max_hands,
+            }, f, indent=4)
+
+
+class ReplaySource:
+    """
+    Plays a recorded session back through the cv2.VideoCapture interface.
+
+    Anything that takes a capture (CameraStream, the scripts) can use it in
+    place of a device. Frames are memory-mapped, not loaded up front.
+    """
+
+    def __init__(self, path, realtime=True, loop=False):
+        """
+        Args:
+            path: The session directory.
+            realtime: Wait between frames as long as the recording did, off to
+                replay as fast as possible for benchmarking.
+            loop: Start over at the end instead of reporting end of stream.
+        """
+        with open(os.path.join(path, 'session.json'), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != SESSION_VERSION:
+            raise ValueError(f"Unsupported session version {self.meta['version']} in {path}")
+
+        self.count = self.meta['frames']
+        self.shape = tuple(self.meta['shape']) if self.count else (0, 0, 3)
+        self.frames = np.memmap(os.path.join(path, 'frames.raw'), dtype=np.uint8, mode='r',
+                                shape=(self.count,) + self.shape) if self.count else None
+        self.timestamps = np.load(os.path.join(path, 'timestamps.npy'))
+        self.landmarks = np.load(os.path.join(path, 'landmarks.npy'))
+        self.handedness = np.load(os.path.join(path, 'handedness.npy'))
+
+        self.realtime = realtime
+        self.loop = loop
+        self.pos = 0
+        self.start = None
+        self.opened = True
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        if self.pos >= self.count:
+            if not self.loop or self.count == 0:
+                return False, None
+            self.pos = 0
+            self.start = None
+
+        if self.realtime:
+            now = time.perf_counter()
+            if self.start is None:
+                self.start = now - self.timestamps[self.pos]
+            delay = self.start + self.timestamps[self.pos] - now
+            if delay > 0:
+                time.sleep(delay)
+
+        # Copy, callers flip and draw on the frames they get
+        img = np.array(self.frames[self.pos])
+        self.pos += 1
+        return True, img
+
+    def recorded_hands(self, pos=None):
+        """Landmarks and handedness codes recorded with frame pos (default: the last one read)."""
+        if pos is None:
+            pos = self.pos - 1
+        return self.landmarks[pos], self.handedness[pos]
+
+    def isOpened(self):
+        return self.opened
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.shape[1])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.shape[0])
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.count)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.pos)
+        if prop_id == cv2.CAP_PROP_FPS:
+            if self.count < 2 or self.timestamps[-1] <= 0:
+                return 0.0
+            return float((self.count - 1) / self.timestamps[-1])
+        return 0.0
+
+    def set(self, prop_id, value):
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.pos = int(value)
+            self.start = None
+            return True
+        return False
+
+    def release(self):
+        self.opened = False
+        self.frames = None
+
+
+def open_source(source):
+    """
+    Opens a capture for a device index, a recorded session directory or
+    anything else cv2.VideoCapture accepts (video file, stream URL).
+    Objects that already look like a capture are returned as they are.
+    """
+    if hasattr(source, 'read'):
+        return source
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    if isinstance(source, str) and os.path.isfile(os.path.join(source, 'session.json')):
+        return ReplaySource(source)
+    return cv2.VideoCapture(source)
@@ -0,0 +1,134 @@
+import contextlib
+import threading
+import time
+
+
+class StartupTimer:
+    """
+    Records how long each import and init stage of a game's startup takes,
+    on whichever thread it runs, so cold-start regressions show up.
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.stages = []
+        self.marked = set()
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started, time.perf_counter())
+
+    def add(self, name, started, ended):
+        with self.lock:
+            self.stages.append((threading.current_thread().name, name, started - self.t0, ended - started))
+
+    def mark(self, name):
+        """Records a point in time, e.g. the first frame drawn."""
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    def mark_once(self, name):
+        """Like mark, but only the first call for a name counts (cheap to call every frame)."""
+        if name not in self.marked:
+            self.marked.add(name)
+            self.mark(name)
+
+    def report(self):
+        with self.lock:
+            stages = sorted(self.stages, key=lambda s: s[2])
+        lines = ['Startup (ms since start, duration):']
+        for thread, name, start, duration in stages:
+            lines.append(f'  {start * 1000:8.1f}  {duration * 1000:8.1f}  {thread:<12} {name}')
+        return '\n'.join(lines)
+
+
+class VisionLoader:
+    """
+    Brings up the camera, the hand detector and the gesture classifier on a
+    background thread, so the game can draw its first frames while cv2,
+    mediapipe and the model backend are imported and initialized.
+
+    The camera is opened first so it warms up while the player is still in
+    the menu. The detector and the classifier each run once on dummy input,
+    so the first real frame doesn't pay for their lazy setup.
+    """
+
+    def __init__(self, source=0, detector_args=None, evaluator_args=None, timer=None):
+        """
+        Args:
+            source: Camera source for CameraStream.
+            detector_args: Keyword arguments for hand_detector.
+            evaluator_args: Keyword arguments for GestureEvaluator.from_backend.
+            timer: StartupTimer to record the stages in.
+        """
+        self.source = source
+        self.detector_args = detector_args or {}
+        self.evaluator_args = evaluator_args or {}
+        self.timer = timer or StartupTimer()
+        self.cap = None
+        self.detector = None
+        self.evaluator = None
+        self.error = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._load, name="VisionLoader", daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        timer = self.timer
+        try:
+            # Imported on their own first so the report shows what they cost
+            with timer.stage('import cv2 + numpy'):
+                import cv2
+                import numpy as np
+            with timer.stage('import camera'):
+                from src.MediPipeHandsModule.CameraStream import CameraStream
+            with timer.stage('open camera'):
+                self.cap = CameraStream(self.source)
+            with timer.stage('import mediapipe'):
+                from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+            with timer.stage('create hand detector'):
+                detector = hand_detector(**self.detector_args)
+            with timer.stage('warm up hand detector'):
+                detector.find_hands(np.zeros((240, 320, 3), dtype=np.uint8), draw=False)
+            self.detector = detector
+            with timer.stage('import classifier'):
+                from src.MediPipeHandsModule.Features import NUM_FEATURES
+                from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
+            with timer.stage('load classifier'):
+                evaluator = GestureEvaluator.from_backend(**self.evaluator_args)
+            with timer.stage('warm up classifier'):
+                # On the model itself, a dummy pose must not end up in the game's PredictionCache
+                model = evaluator.cache.model if evaluator.cache is not None else evaluator.model
+                model.predict_proba(np.zeros((1, NUM_FEATURES), dtype=np.float32))
+            self.evaluator = evaluator
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def ready(self):
+        return self.done.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the loader.
+
+        Returns:
+            (cap, detector, evaluator)
+        """
+        self.done.wait(timeout)
+        if self.error is not None:
+            raise RuntimeError(f'Starting the camera and gesture recognition failed: {self.error}') from self.error
+        return self.cap, self.detector, self.evaluator
+
+    def close(self):
+        self.done.wait()
+        if self.cap is not None:
+            self.cap.release()
+        if self.detector is not None:
+            self.detector.close()
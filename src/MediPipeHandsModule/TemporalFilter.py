@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al. 2012) applied elementwise to a landmark array.
+
+    Slow movements are smoothed hard (cutoff close to min_cutoff) to remove
+    jitter, fast movements raise the cutoff so the filter adds almost no lag.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        """
+        Args:
+            min_cutoff: Cutoff frequency in Hz used while the hand holds still.
+            beta: How fast the cutoff rises with speed (per pixel/second).
+            d_cutoff: Cutoff frequency for the speed estimate itself.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        """Forget the previous hand, e.g. after it left the frame."""
+        self.x_prev = None
+        self.dx_prev = None
+        self.t_prev = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, timestamp):
+        """
+        Args:
+            x: The new landmark array, e.g. HandResult.landmarks.
+            timestamp: Its capture time in seconds.
+
+        Returns:
+            The filtered array as a new float64 array, the filter's own state
+            is never handed out.
+        """
+        if self.x_prev is None:
+            self.x_prev = np.array(x, dtype=np.float64)
+            self.dx_prev = np.zeros_like(self.x_prev)
+            self._a = np.empty_like(self.x_prev)
+            self._dx = np.empty_like(self.x_prev)
+            self.t_prev = timestamp
+            return self.x_prev.copy()
+
+        dt = timestamp - self.t_prev
+        if dt <= 0:
+            # Same camera frame again, nothing new to filter
+            return self.x_prev.copy()
+        self.t_prev = timestamp
+
+        # Smoothed speed
+        a_d = self._alpha(dt, self.d_cutoff)
+        np.subtract(x, self.x_prev, out=self._dx)
+        self._dx /= dt
+        self.dx_prev += a_d * (self._dx - self.dx_prev)
+
+        # Speed-dependent smoothing factor, per coordinate
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx_prev)
+        np.divide(1.0, 1.0 + 1.0 / (2 * math.pi * cutoff * dt), out=self._a)
+
+        self.x_prev += self._a * (x - self.x_prev)
+        return self.x_prev.copy()
+
+
+class GestureHysteresis:
+    """
+    Turns per-frame gesture predictions into a stable decision.
+
+    Every label keeps a confidence. The decision switches to a label as soon
+    as its confidence reaches `enter` and holds it until it falls below
+    `exit`, so one-frame flickers are ignored.
+
+    With hard labels (update) the confidence is a moving average of how
+    often the label was predicted recently, a consistent gesture fires after
+    two frames. With class probabilities (update_proba) it is a moving
+    average of the probabilities at the same rate. While nothing is held and
+    every confidence has decayed below `exit` (after reset(), or once the
+    hand has been gone a few frames) it starts over from the frame's
+    probabilities, so a confident gesture fires on its first frame, an unsure
+    one never does and a single odd frame during a held gesture doesn't
+    switch the decision.
+
+    The probabilities are not calibrated: they are the forest's tree votes,
+    the KNN's neighbour votes or the CNN's softmax. Wrapping the forest in
+    CalibratedClassifierCV would keep it from being compiled
+    (CompiledForest) and cached, so enter and exit apply to the raw
+    probabilities.
+    """
+
+    def __init__(self, enter=0.6, exit=0.4, rate=0.5):
+        self.enter = enter
+        self.exit = exit
+        self.rate = rate
+        self.reset()
+
+    def reset(self):
+        self.confidence = {}
+        self.current = None
+
+    def _decide(self):
+        if self.current is not None and self.confidence.get(self.current, 0.0) < self.exit:
+            self.current = None
+        if self.confidence:
+            best = max(self.confidence, key=self.confidence.get)
+            if best != self.current and self.confidence[best] >= self.enter:
+                self.current = best
+        return self.current
+
+    def update(self, label):
+        """
+        Args:
+            label: This frame's prediction, or None when no hand was seen.
+
+        Returns:
+            The current decision, or None if no gesture is held.
+        """
+        keep = 1.0 - self.rate
+        for key in self.confidence:
+            self.confidence[key] *= keep
+        if label is not None:
+            self.confidence[label] = self.confidence.get(label, 0.0) + self.rate
+        return self._decide()
+
+    def update_proba(self, classes, proba):
+        """
+        Args:
+            classes: The labels, e.g. GestureEvaluator.classes.
+            proba: This frame's probability per label, e.g. from
+                GestureEvaluator.evaluate_proba.
+
+        Returns:
+            The current decision, or None if no gesture is held.
+        """
+        proba = dict(zip(np.asarray(classes).tolist(), np.asarray(proba).tolist()))
+        if self.current is None and all(c < self.exit for c in self.confidence.values()):
+            # Nothing held or on its way, start from this frame
+            self.confidence = proba
+        else:
+            keep = 1.0 - self.rate
+            for key in self.confidence.keys() | proba.keys():
+                self.confidence[key] = self.confidence.get(key, 0.0) * keep + proba.get(key, 0.0) * self.rate
+        return self._decide()
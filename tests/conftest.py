@@ -0,0 +1,7 @@
+import os
+import sys
+
+# modules inside src/ import each other as src.MediPipeHandsModule.*
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
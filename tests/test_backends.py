@@ -0,0 +1,67 @@
+import joblib
+import numpy as np
+import pytest
+
+sklearn_ensemble = pytest.importorskip('sklearn.ensemble')
+
+from src.MediPipeHandsModule.Backends import HandRouter, load_backend, load_routed
+
+
+def fit_forest(n_features, labels, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(40, n_features))
+    y = np.resize(labels, 40)
+    return sklearn_ensemble.RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+
+
+def save(tmp_path, name, model):
+    path = str(tmp_path / name)
+    joblib.dump(model, path)
+    return path
+
+
+def test_routes_rows_by_handedness(tmp_path):
+    left = save(tmp_path, 'left.pkl', fit_forest(42, [1, 2]))
+    right = save(tmp_path, 'right.pkl', fit_forest(42, [2, 3], seed=1))
+    router = load_routed([left, right])
+    assert router.classes_.tolist() == [1, 2, 3]
+
+    X = np.zeros((2, 43), dtype=np.float32)
+    X[1, 0] = 1
+    proba = router.predict_proba(X)
+    assert proba.shape == (2, 3)
+    # Left rows never get the right hand's gesture 3 and the other way round
+    assert proba[0, 2] == 0 and proba[1, 0] == 0
+
+
+def test_rejects_model_with_handedness_column(tmp_path):
+    left = save(tmp_path, 'left.pkl', fit_forest(84, [1, 2]))
+    right = save(tmp_path, 'right.pkl', fit_forest(42, [1, 2]))
+    with pytest.raises(ValueError, match='train_hands.py'):
+        load_routed([left, right])
+
+
+def test_rejects_single_gesture_model(tmp_path):
+    left = save(tmp_path, 'left.pkl', fit_forest(42, [1, 2]))
+    right = save(tmp_path, 'right.pkl', fit_forest(42, [1]))
+    with pytest.raises(ValueError, match='train_hands.py'):
+        load_routed([left, right])
+    with pytest.raises(ValueError):
+        HandRouter(fit_forest(42, [1, 2]), fit_forest(42, [1]))
+
+
+def test_committed_left_right_models_load():
+    router = load_backend('left_right', artifacts=False)
+    assert len(router.classes_) > 1
+
+
+def test_indexed_knn_brute_force_matches_tree():
+    from src.MediPipeHandsModule.IndexedKNN import IndexedKNN
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 43)).astype(np.float32)
+    y = rng.integers(1, 5, size=300)
+    brute = IndexedKNN.fit(X, y)
+    tree = IndexedKNN.fit(X, y, index='kd_tree')
+    assert brute.index == 'brute' and brute.samples.dtype == np.float32
+    queries = rng.normal(size=(50, 43))
+    assert np.array_equal(brute.predict_proba(queries), tree.predict_proba(queries))
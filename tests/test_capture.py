@@ -0,0 +1,43 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('cv2')
+
+spec = importlib.util.spec_from_file_location(
+    'capture', os.path.join(os.path.dirname(__file__), '..', 'scripts', 'capture.py'))
+capture = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(capture)
+
+
+class Writer:
+    def __init__(self):
+        self.labels = []
+
+    def put(self, labels, handedness, landmarks):
+        self.labels.extend(labels)
+
+
+def test_burst_drops_frames_after_the_last_key_event():
+    writer = Writer()
+    counts = {}
+    buffer = capture.BurstBuffer(writer, counts)
+    buffer.confirm(1.0)
+    for i, t in enumerate([0.9, 1.0, 1.2, 1.4]):
+        buffer.add(3, 'Right', np.full(42, float(i)), captured=t)
+    buffer.end(1.0)
+    assert writer.labels == [3, 3]
+    assert counts == {3: 2}
+
+
+def test_burst_keeps_frames_confirmed_by_a_later_repeat():
+    writer = Writer()
+    buffer = capture.BurstBuffer(writer, {})
+    buffer.confirm(1.0)
+    for i, t in enumerate([0.9, 1.2, 1.4]):
+        buffer.add(5, 'Left', np.full(42, float(i)), captured=t)
+    buffer.confirm(1.5)
+    buffer.end(1.5)
+    assert writer.labels == [5, 5, 5]
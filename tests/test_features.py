@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.MediPipeHandsModule.Augment import LandmarkAugmenter
+from src.MediPipeHandsModule.Features import NUM_FEATURES, extract_features, extract_features_batch
+from src.MediPipeHandsModule.HandResult import landmark_bbox
+
+
+def hand(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(100, 300, size=(21, 2))
+
+
+def test_extract_features_shape_and_handedness():
+    landmarks = hand()
+    features = extract_features(landmarks, 'Right', landmark_bbox(landmarks))
+    assert features.shape == (NUM_FEATURES,)
+    assert features.dtype == np.float32
+    assert features[0] == 1
+    assert extract_features(landmarks, 'Left', landmark_bbox(landmarks))[0] == 0
+    # The wrist is the origin
+    assert np.all(features[1:3] == 0)
+
+
+def test_extract_features_ignores_position_and_size():
+    landmarks = hand()
+    features = extract_features(landmarks, 'Right', landmark_bbox(landmarks))
+    moved = landmarks * 2.5 + (40, 60)
+    assert np.allclose(extract_features(moved, 'Right', landmark_bbox(moved)), features, atol=1e-6)
+
+
+def test_extract_features_batch_matches_single():
+    hands = np.stack([hand(0), hand(1)])
+    bboxes = np.array([landmark_bbox(h) for h in hands])
+    batch = extract_features_batch(hands, ['Left', 'Right'], bboxes)
+    assert np.array_equal(batch[1], extract_features(hands[1], 'Right', bboxes[1]))
+
+
+def test_variants_keep_the_runtime_extent():
+    rows = np.stack([extract_features(hand(i), 'Right', landmark_bbox(hand(i))) for i in range(20)])
+    augmenter = LandmarkAugmenter(rotate=15, scale=0.2, noise=0, seed=0)
+    variants, labels = augmenter.variants(rows, np.arange(20), copies=3)
+    assert variants.shape == (60, NUM_FEATURES)
+    extent = np.ptp(rows[:, 1:].reshape(-1, 21, 2), axis=1)
+    variant_extent = np.ptp(variants[:, 1:].reshape(-1, 21, 2), axis=1)
+    assert np.allclose(variant_extent, np.tile(extent, (3, 1)), atol=1e-5)
+    assert np.all(variants[:, 1:3] == 0)
+    assert not np.allclose(variants, np.tile(rows, (3, 1)))
+
+
+def test_mirror_remaps_labels():
+    rows = np.stack([extract_features(hand(i), 'Right', landmark_bbox(hand(i))) for i in range(4)])
+    X, y = LandmarkAugmenter(mirror={2: 4}).mirror(rows, np.array([1, 2, 2, 3]))
+    assert y.tolist() == [4, 4]
+    assert np.allclose(X[:, 1::2], -rows[1:3, 1::2])
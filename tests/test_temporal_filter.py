@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.MediPipeHandsModule.TemporalFilter import GestureHysteresis, OneEuroFilter
+
+CLASSES = [1, 2, 3]
+
+
+def test_confident_gesture_fires_on_first_frame():
+    decision = GestureHysteresis()
+    assert decision.update_proba(CLASSES, [0.9, 0.05, 0.05]) == 1
+
+
+def test_unsure_gesture_never_fires():
+    decision = GestureHysteresis()
+    for _ in range(10):
+        assert decision.update_proba(CLASSES, [0.5, 0.3, 0.2]) is None
+
+
+def test_returning_hand_fires_on_first_frame():
+    decision = GestureHysteresis()
+    decision.update_proba(CLASSES, [0.9, 0.05, 0.05])
+    # Hand lost, the games only decay the confidences
+    for _ in range(5):
+        decision.update(None)
+    assert decision.current is None
+    assert decision.update_proba(CLASSES, [0.05, 0.9, 0.05]) == 2
+
+
+def test_single_odd_frame_does_not_switch():
+    decision = GestureHysteresis()
+    decision.update_proba(CLASSES, [0.9, 0.05, 0.05])
+    assert decision.update_proba(CLASSES, [0.05, 0.9, 0.05]) == 1
+    assert decision.update_proba(CLASSES, [0.9, 0.05, 0.05]) == 1
+
+
+def test_held_gesture_switches_after_consistent_frames():
+    decision = GestureHysteresis()
+    decision.update_proba(CLASSES, [0.9, 0.05, 0.05])
+    results = [decision.update_proba(CLASSES, [0.05, 0.9, 0.05]) for _ in range(3)]
+    assert results[-1] == 2
+
+
+def test_hard_labels_fire_after_two_frames():
+    decision = GestureHysteresis()
+    assert decision.update(3) is None
+    assert decision.update(3) == 3
+
+
+def test_one_euro_filter_returns_a_copy():
+    landmark_filter = OneEuroFilter()
+    first = landmark_filter(np.zeros((21, 2)), 0.0)
+    first += 100
+    second = landmark_filter(np.zeros((21, 2)), 1 / 30)
+    assert np.allclose(second, 0.0)